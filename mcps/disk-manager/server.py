@@ -3,18 +3,37 @@
 DISK_MANAGER - Complete Disk Management Skill
 """
 import asyncio
+import bisect
+import mmap
+import re
 import subprocess
 import os
+import signal
 import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Optional, List
 from datetime import datetime
+
+# Answer --help before paying for the mcp/pydantic imports below
+if __name__ == "__main__" and sys.argv[1:2] in (["--help"], ["-h"]):
+    print(__doc__)
+    sys.exit(0)
+
 from mcp.server import Server
 from mcp.types import Tool, TextContent
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 # Configuration
 DISK_MONITOR_DIR = Path.home() / ".disk_monitor"
+APPROVED_FILE = DISK_MONITOR_DIR / "approved_apps.txt"
+PENDING_FILE = DISK_MONITOR_DIR / "pending_apps.txt"
+PENDING_TMP_FILE = DISK_MONITOR_DIR / "pending_apps.txt.tmp"
+HISTORY_LOG = DISK_MONITOR_DIR / "disk_usage.log"
+APP_SCAN_CMD = f"{DISK_MONITOR_DIR}/app_manager.sh scan 2>/dev/null"
 SKILL_NAME = os.environ.get("MCP_SKILL_NAME", "disk_manager")
 server = Server(SKILL_NAME)
 
@@ -22,6 +41,32 @@ server = Server(SKILL_NAME)
 THRESHOLD_WARNING = 75
 THRESHOLD_EMERGENCY = 85
 THRESHOLD_CRITICAL = 90
+_STATUS_CUTS = [THRESHOLD_WARNING, THRESHOLD_EMERGENCY, THRESHOLD_CRITICAL]
+_STATUS_LEVELS = ["NORMAL", "WARNING", "EMERGENCY", "CRITICAL"]
+
+# Seconds a disk usage snapshot is reused across back-to-back tool calls
+DISK_CACHE_TTL = 2.0
+_DISK_CACHE = {"t": 0.0, "v": None}
+
+# Seconds before get_app_status re-runs app_manager.sh scan
+APP_SCAN_TTL = 30.0
+_APP_SCAN = {"t": None, "running": False}
+_APP_SCAN_LOCK = threading.Lock()
+# Serializes approve_app rewrites of pending_apps.txt (handlers run on threads)
+_APPROVE_LOCK = threading.Lock()
+
+# Lines of cleanup command output kept for the tool response
+CLEANUP_OUTPUT_LINES = 4096
+
+# Bytes read per backwards step when tailing disk_usage.log
+TAIL_CHUNK = 8192
+
+# "date time,used_kb" rows in disk_usage.log
+_HISTORY_ROW_RE = re.compile(rb"^([^,\n]+),(\d+)[ \t\r]*(?:,|$)", re.M)
+
+# Threads used to size cache directories in parallel
+SCAN_WORKERS = 16
+_SEEN_LINKS_LOCK = threading.Lock()
 
 
 # ============== ARGUMENT MODELS ==============
@@ -120,6 +165,41 @@ CLEANUP_PROCEDURES = {
     }
 }
 
+# Rendered entries, category index and totals are fixed, so compute them once
+_PROC_RENDERED = {}
+_PROC_BY_CATEGORY = {}
+_PROC_CATEGORY_GB = {}
+for _proc_id, _proc in CLEANUP_PROCEDURES.items():
+    _PROC_RENDERED[_proc_id] = (
+        f"📦 {_proc['name']} ({_proc_id})\n"
+        f"   Location: {_proc['location']}\n"
+        f"   Expected: ~{_proc['typical_space_gb']} GB\n"
+        f"   Safety: {_proc['safety'].upper()}"
+    )
+    _PROC_BY_CATEGORY.setdefault(_proc["category"], []).append(_proc_id)
+    _PROC_CATEGORY_GB[_proc["category"]] = _PROC_CATEGORY_GB.get(_proc["category"], 0) + _proc["typical_space_gb"]
+_PROC_TOTAL_GB = sum(_PROC_CATEGORY_GB.values())
+
+
+# ============== JUNK SCAN LOCATIONS ==============
+
+# $HOME is fixed for the process, so expand these once
+SCAN_LOCATIONS = [
+    (name, os.path.expanduser(path.replace('"', '')))
+    for name, path in [
+        ("NPM Cache", "~/.npm"),
+        ("pnpm Store", "~/Library/pnpm/store"),
+        ("Homebrew", "/opt/homebrew"),
+        ("System Caches", "~/Library/Caches"),
+        ("System Logs", "~/Library/Logs"),
+        ("Puppeteer Cache", "~/.cache/puppeteer"),
+        ("UV Cache", "~/.cache/uv"),
+        ("Whisper Cache", "~/.cache/whisper"),
+        ("VS Code Caches", '~/Library/"Application Support"/Code/CachedData'),
+        ("Google Caches", "~/Library/Caches/Google"),
+    ]
+]
+
 
 # ============== TOOL DESCRIPTIONS ==============
 
@@ -136,48 +216,53 @@ TOOL_DESCRIPTIONS = {
 
 # ============== TOOL LISTING ==============
 
+# Schemas and Tool entries never change, so build them once at import
+_EMPTY_SCHEMA = EmptyArgs.model_json_schema()
+
+_TOOLS = [
+    Tool(name="get_disk_status", description=TOOL_DESCRIPTIONS["get_disk_status"], inputSchema=_EMPTY_SCHEMA),
+    Tool(name="scan_junk", description=TOOL_DESCRIPTIONS["scan_junk"], inputSchema=_EMPTY_SCHEMA),
+    Tool(name="get_procedures", description=TOOL_DESCRIPTIONS["get_procedures"], inputSchema=ProcedureArgs.model_json_schema()),
+    Tool(name="get_emergency_workflow", description=TOOL_DESCRIPTIONS["get_emergency_workflow"], inputSchema=WorkflowArgs.model_json_schema()),
+    Tool(name="execute_cleanup", description=TOOL_DESCRIPTIONS["execute_cleanup"], inputSchema=CleanupArgs.model_json_schema()),
+    Tool(name="get_app_status", description=TOOL_DESCRIPTIONS["get_app_status"], inputSchema=_EMPTY_SCHEMA),
+    Tool(name="approve_app", description=TOOL_DESCRIPTIONS["approve_app"], inputSchema=AppApproveArgs.model_json_schema()),
+    Tool(name="get_history", description=TOOL_DESCRIPTIONS["get_history"], inputSchema=HistoryArgs.model_json_schema()),
+]
+
 @server.list_tools()
 async def list_tools():
-    return [
-        Tool(name="get_disk_status", description=TOOL_DESCRIPTIONS["get_disk_status"], inputSchema=EmptyArgs.model_json_schema()),
-        Tool(name="scan_junk", description=TOOL_DESCRIPTIONS["scan_junk"], inputSchema=EmptyArgs.model_json_schema()),
-        Tool(name="get_procedures", description=TOOL_DESCRIPTIONS["get_procedures"], inputSchema=ProcedureArgs.model_json_schema()),
-        Tool(name="get_emergency_workflow", description=TOOL_DESCRIPTIONS["get_emergency_workflow"], inputSchema=WorkflowArgs.model_json_schema()),
-        Tool(name="execute_cleanup", description=TOOL_DESCRIPTIONS["execute_cleanup"], inputSchema=CleanupArgs.model_json_schema()),
-        Tool(name="get_app_status", description=TOOL_DESCRIPTIONS["get_app_status"], inputSchema=EmptyArgs.model_json_schema()),
-        Tool(name="approve_app", description=TOOL_DESCRIPTIONS["approve_app"], inputSchema=AppApproveArgs.model_json_schema()),
-        Tool(name="get_history", description=TOOL_DESCRIPTIONS["get_history"], inputSchema=HistoryArgs.model_json_schema()),
-    ]
+    return _TOOLS
 
 
 # ============== TOOL ROUTER ==============
 
+# name -> (argument model, handler taking the validated args)
+_HANDLERS = {
+    "get_disk_status": (EmptyArgs, lambda a: do_get_disk_status()),
+    "scan_junk": (EmptyArgs, lambda a: do_scan_junk()),
+    "get_procedures": (ProcedureArgs, lambda a: do_get_procedures(a.category)),
+    "get_emergency_workflow": (WorkflowArgs, lambda a: do_get_emergency_workflow(a.current_percent)),
+    "execute_cleanup": (CleanupArgs, lambda a: do_execute_cleanup(a.procedure, a.confirm)),
+    "get_app_status": (EmptyArgs, lambda a: do_get_app_status()),
+    "approve_app": (AppApproveArgs, lambda a: do_approve_app(a.app_name)),
+    "get_history": (HistoryArgs, lambda a: do_get_history(a.days)),
+}
+
+# Validators built once per argument model
+_ADAPTERS = {model_cls: TypeAdapter(model_cls) for model_cls, _ in _HANDLERS.values()}
+
 @server.call_tool()
 async def call_tool(name: str, arguments: dict):
     try:
-        if name == "get_disk_status":
-            result = do_get_disk_status()
-        elif name == "scan_junk":
-            result = do_scan_junk()
-        elif name == "get_procedures":
-            args = ProcedureArgs(**arguments)
-            result = do_get_procedures(args.category)
-        elif name == "get_emergency_workflow":
-            args = WorkflowArgs(**arguments)
-            result = do_get_emergency_workflow(args.current_percent)
-        elif name == "execute_cleanup":
-            args = CleanupArgs(**arguments)
-            result = do_execute_cleanup(args.procedure, args.confirm)
-        elif name == "get_app_status":
-            result = do_get_app_status()
-        elif name == "approve_app":
-            args = AppApproveArgs(**arguments)
-            result = do_approve_app(args.app_name)
-        elif name == "get_history":
-            args = HistoryArgs(**arguments)
-            result = do_get_history(args.days)
-        else:
+        entry = _HANDLERS.get(name)
+        if entry is None:
             result = f"Unknown tool: {name}"
+        else:
+            model_cls, handler = entry
+            args = _ADAPTERS[model_cls].validate_python(arguments)
+            # Handlers do blocking FS/subprocess work; run them off the event loop
+            result = await asyncio.to_thread(handler, args)
         return [TextContent(type="text", text=result)]
     except Exception as e:
         return [TextContent(type="text", text=f"Error: {str(e)}")]
@@ -195,40 +280,167 @@ def run_cmd(cmd: str, timeout: int = 30) -> str:
     except Exception as e:
         return f"Error: {e}"
 
+def run_cmd_tail(cmd: str, timeout: int = 30, max_lines: int = CLEANUP_OUTPUT_LINES) -> str:
+    """Run a shell command and return the last max_lines of stdout+stderr.
+
+    Output is drained line by line while the command runs, so a noisy command
+    holds at most max_lines in memory instead of its whole output.
+    """
+    try:
+        proc = subprocess.Popen(
+            cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            text=True, errors="replace", bufsize=1, start_new_session=True,
+        )
+    except Exception as e:
+        return f"Error: {e}"
+    
+    tail = deque(maxlen=max_lines)
+    
+    def drain():
+        for line in proc.stdout:
+            tail.append(line.rstrip("\n"))
+    
+    reader = threading.Thread(target=drain, daemon=True)
+    reader.start()
+    try:
+        proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        os.killpg(proc.pid, signal.SIGKILL)
+        proc.wait()
+        tail.append("Command timed out")
+    reader.join(timeout=5)
+    return "\n".join(tail).strip()
+
+def _disk_snapshot() -> tuple:
+    """(total, used, available, percent) for "/" from os.statvfs, reused for DISK_CACHE_TTL seconds.
+
+    percent follows df's Capacity column: used / (used + available), rounded up.
+    """
+    now = time.monotonic()
+    if _DISK_CACHE["v"] is not None and now - _DISK_CACHE["t"] < DISK_CACHE_TTL:
+        return _DISK_CACHE["v"]
+    st = os.statvfs("/")
+    total = st.f_blocks * st.f_frsize
+    used = (st.f_blocks - st.f_bfree) * st.f_frsize
+    available = st.f_bavail * st.f_frsize
+    percent = -(-used * 100 // (used + available)) if used + available else 0
+    snapshot = (total, used, available, percent)
+    _DISK_CACHE.update(t=now, v=snapshot)
+    return snapshot
+
+def _invalidate_disk_snapshot():
+    """Force the next _disk_snapshot() to re-read the filesystem"""
+    _DISK_CACHE["v"] = None
+
 def get_disk_percent() -> int:
     """Get current disk usage percentage"""
-    output = run_cmd("df -h / | tail -1 | awk '{print $5}' | tr -d '%'")
     try:
-        return int(output)
-    except:
+        return _disk_snapshot()[3]
+    except OSError:
         return 0
 
+def _scan_dir(path: str, seen_links: set) -> tuple:
+    """Disk usage of entries directly under path; return (bytes, subdirectories).
+
+    Matches `du`: counts allocated blocks (directories included) rather than
+    apparent size, never follows symlinks, and counts a hard-linked inode once
+    per scan (seen_links is shared by all workers of one scan).
+    """
+    total = 0
+    subdirs = []
+    try:
+        it = os.scandir(path)
+    except OSError:
+        return 0, subdirs
+    with it:
+        for entry in it:
+            try:
+                st = entry.stat(follow_symlinks=False)
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif st.st_nlink > 1:
+                    key = (st.st_dev, st.st_ino)
+                    with _SEEN_LINKS_LOCK:
+                        if key in seen_links:
+                            continue
+                        seen_links.add(key)
+                total += st.st_blocks * 512
+            except OSError:
+                pass
+    return total, subdirs
+
+def _walk_owned(root: str, owners: tuple, nested: dict, seen_links: set) -> dict:
+    """Sizes of one tree keyed by location index.
+
+    Files count toward every location in owners; entering a directory listed in
+    nested adds that location for everything below it.
+    """
+    sizes = {}
+    stack = [(root, owners)]
+    while stack:
+        path, owned_by = stack.pop()
+        size, subdirs = _scan_dir(path, seen_links)
+        for i in owned_by:
+            sizes[i] = sizes.get(i, 0) + size
+        for sub in subdirs:
+            extra = nested.get(sub)
+            stack.append((sub, owned_by if extra is None else owned_by + (extra,)))
+    return sizes
+
+def _location_sizes(paths: List[str]) -> tuple:
+    """Size several directory trees in a single concurrent pass.
+
+    Paths may nest (e.g. ~/Library/Caches/Google inside ~/Library/Caches): only
+    the outermost ones are walked and each inode is visited once. Each root's
+    first level is scanned on the pool, then every subdirectory is sized as its
+    own task, so one deep tree spreads across idle workers.
+
+    Returns (per-path sizes, combined size counting nested paths once).
+    """
+    paths = [os.path.normpath(p) for p in paths]
+    index = {p: i for i, p in enumerate(paths)}
+    roots = [p for p in index if not any(p.startswith(q + os.sep) for q in index)]
+    nested = {p: i for p, i in index.items() if p not in roots}
+    totals = [0] * len(paths)
+    seen_links = set()
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as pool:
+        tops = {pool.submit(_scan_dir, root, seen_links): root for root in roots}
+        subtrees = []
+        for fut in as_completed(tops):
+            owners = (index[tops[fut]],)
+            size, subdirs = fut.result()
+            totals[owners[0]] += size
+            for sub in subdirs:
+                extra = nested.get(sub)
+                sub_owners = owners if extra is None else owners + (extra,)
+                subtrees.append(pool.submit(_walk_owned, sub, sub_owners, nested, seen_links))
+        for fut in subtrees:
+            for i, size in fut.result().items():
+                totals[i] += size
+    return [totals[index[p]] for p in paths], sum(totals[index[root]] for root in roots)
+
+def _human_size(num_bytes: float) -> str:
+    """Format a byte count like `du -h` (e.g. 512K, 1.2G)"""
+    for unit in ("B", "K", "M", "G"):
+        if num_bytes < 1024:
+            return f"{num_bytes:.0f}{unit}" if unit == "B" else f"{num_bytes:.1f}{unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f}T"
+
 def get_status_level(percent: int) -> str:
     """Get status level based on percentage"""
-    if percent >= THRESHOLD_CRITICAL:
-        return "CRITICAL"
-    elif percent >= THRESHOLD_EMERGENCY:
-        return "EMERGENCY"
-    elif percent >= THRESHOLD_WARNING:
-        return "WARNING"
-    return "NORMAL"
+    return _STATUS_LEVELS[bisect.bisect_right(_STATUS_CUTS, percent)]
 
 def do_get_disk_status() -> str:
     """Get current disk status"""
-    df_output = run_cmd("df -h / | tail -1")
-    parts = df_output.split()
-    
-    if len(parts) >= 5:
-        total = parts[1]
-        used = parts[2]
-        available = parts[3]
-        percent_str = parts[4].replace('%', '')
-        try:
-            percent = int(percent_str)
-        except:
-            percent = 0
-    else:
-        return f"Error parsing df output: {df_output}"
+    try:
+        total_bytes, used_bytes, available_bytes, percent = _disk_snapshot()
+    except OSError as e:
+        return f"Error reading disk usage: {e}"
+    
+    total = _human_size(total_bytes)
+    used = _human_size(used_bytes)
+    available = _human_size(available_bytes)
     
     status = get_status_level(percent)
     
@@ -253,108 +465,38 @@ Thresholds:
 
 def do_scan_junk() -> str:
     """Scan for cleanable junk files"""
-    output = "=== JUNK SCAN RESULTS ===\n\n"
-    
-    # Check various cache locations
-    locations = [
-        ("NPM Cache", "~/.npm"),
-        ("pnpm Store", "~/Library/pnpm/store"),
-        ("Homebrew", "/opt/homebrew"),
-        ("System Caches", "~/Library/Caches"),
-        ("System Logs", "~/Library/Logs"),
-        ("Puppeteer Cache", "~/.cache/puppeteer"),
-        ("UV Cache", "~/.cache/uv"),
-        ("Whisper Cache", "~/.cache/whisper"),
-        ("VS Code Caches", '~/Library/"Application Support"/Code/CachedData'),
-        ("Google Caches", "~/Library/Caches/Google"),
-    ]
+    output = ["=== JUNK SCAN RESULTS ===", ""]
     
-    total_mb = 0
-    output += "📦 CACHE SIZES:\n"
-    
-    for name, path in locations:
-        expanded = os.path.expanduser(path.replace('"', ''))
-        if os.path.exists(expanded):
-            size_output = run_cmd(f'du -sh "{expanded}" 2>/dev/null | cut -f1')
-            if size_output and not size_output.startswith("Error"):
-                output += f"  {name}: {size_output}\n"
-                # Try to parse size for total
-                try:
-                    if 'G' in size_output:
-                        total_mb += float(size_output.replace('G', '')) * 1024
-                    elif 'M' in size_output:
-                        total_mb += float(size_output.replace('M', ''))
-                except:
-                    pass
-    
-    output += f"\n📊 ESTIMATED CLEANABLE: ~{total_mb/1024:.1f} GB\n"
-    output += "\n💡 Use get_procedures() to see cleanup options."
-    output += "\n⚠️ Remember: execute_cleanup requires explicit permission!"
+    output.append("📦 CACHE SIZES:")
+    found = [(name, path) for name, path in SCAN_LOCATIONS if os.path.exists(path)]
+    sizes, total = _location_sizes([path for _, path in found])
+    for (name, _), size in zip(found, sizes):
+        output.append(f"  {name}: {_human_size(size)}")
     
-    return output
-
-def do_get_procedures(category: Optional[str] = None) -> str:
-    """Get available cleanup procedures"""
-    output = "=== CLEANUP PROCEDURES ===\n\n"
-    
-    total_space = 0
-    for proc_id, proc in CLEANUP_PROCEDURES.items():
-        if category and proc["category"] != category:
-            continue
-        
-        output += f"📦 {proc['name']} ({proc_id})\n"
-        output += f"   Category: {proc['category']}\n"
-        output += f"   Location: {proc['location']}\n"
-        output += f"   Expected: ~{proc['typical_space_gb']} GB\n"
-        output += f"   Safety: {proc['safety'].upper()}\n"
-        output += f"   {proc['description']}\n\n"
-        total_space += proc['typical_space_gb']
-    
-    output += f"💾 TOTAL POTENTIAL SAVINGS: ~{total_space:.1f} GB\n"
-    output += "\n⚠️ To execute: use execute_cleanup with procedure name and confirm=true"
-    output += "\n🔒 ALWAYS ask user permission before running any cleanup!"
-    
-    return output
-
-
-def do_scan_junk() -> str:
-    """Scan for cleanable junk files"""
-    output = "=== JUNK SCAN RESULTS ===\n\n"
-    locations = [
-        ("NPM Cache", "~/.npm"),
-        ("pnpm Store", "~/Library/pnpm/store"),
-        ("System Caches", "~/Library/Caches"),
-        ("Puppeteer Cache", "~/.cache/puppeteer"),
-        ("UV Cache", "~/.cache/uv"),
-        ("Google Caches", "~/Library/Caches/Google"),
-    ]
-    total_mb = 0
-    output += "📦 CACHE SIZES:\n"
-    for name, path in locations:
-        expanded = os.path.expanduser(path)
-        if os.path.exists(expanded):
-            size_output = run_cmd(f'du -sh "{expanded}" 2>/dev/null | cut -f1')
-            if size_output and not size_output.startswith("Error"):
-                output += f"  {name}: {size_output}\n"
-    output += "\n💡 Use get_procedures() to see cleanup options."
-    return output
+    output.append("")
+    output.append(f"📊 ESTIMATED CLEANABLE: ~{total / 1024**3:.1f} GB")
+    output.append("")
+    output.append("💡 Use get_procedures() to see cleanup options.")
+    output.append("⚠️ Remember: execute_cleanup requires explicit permission!")
+    return "\n".join(output)
 
 
 def do_get_procedures(category: Optional[str] = None) -> str:
     """Get available cleanup procedures"""
-    output = "=== CLEANUP PROCEDURES ===\n\n"
-    total_space = 0
-    for proc_id, proc in CLEANUP_PROCEDURES.items():
-        if category and proc["category"] != category:
-            continue
-        output += f"📦 {proc['name']} ({proc_id})\n"
-        output += f"   Location: {proc['location']}\n"
-        output += f"   Expected: ~{proc['typical_space_gb']} GB\n"
-        output += f"   Safety: {proc['safety'].upper()}\n\n"
-        total_space += proc['typical_space_gb']
-    output += f"💾 TOTAL POTENTIAL: ~{total_space:.1f} GB\n"
-    output += "\n⚠️ Use execute_cleanup with confirm=true (requires permission!)"
-    return output
+    output = ["=== CLEANUP PROCEDURES ===", ""]
+    if category:
+        proc_ids = _PROC_BY_CATEGORY.get(category, [])
+        total_space = _PROC_CATEGORY_GB.get(category, 0)
+    else:
+        proc_ids = CLEANUP_PROCEDURES
+        total_space = _PROC_TOTAL_GB
+    for proc_id in proc_ids:
+        output.append(_PROC_RENDERED[proc_id])
+        output.append("")
+    output.append(f"💾 TOTAL POTENTIAL: ~{total_space:.1f} GB")
+    output.append("")
+    output.append("⚠️ Use execute_cleanup with confirm=true (requires permission!)")
+    return "\n".join(output)
 
 
 def do_get_emergency_workflow(current_percent: Optional[int] = None) -> str:
@@ -363,16 +505,20 @@ def do_get_emergency_workflow(current_percent: Optional[int] = None) -> str:
         current_percent = get_disk_percent()
     
     status = get_status_level(current_percent)
-    output = f"=== EMERGENCY WORKFLOW ===\n"
-    output += f"Current Usage: {current_percent}%\n"
-    output += f"Status: {status}\n\n"
+    output = [
+        "=== EMERGENCY WORKFLOW ===",
+        f"Current Usage: {current_percent}%",
+        f"Status: {status}",
+        "",
+    ]
     
     if status == "NORMAL":
-        output += "✅ Disk is healthy. No immediate action needed.\n"
-        output += "💡 Consider monthly maintenance: npm_cache, dev_caches, homebrew"
-        return output
+        output.append("✅ Disk is healthy. No immediate action needed.")
+        output.append("💡 Consider monthly maintenance: npm_cache, dev_caches, homebrew")
+        return "\n".join(output)
     
-    output += "🚨 RECOMMENDED CLEANUP SEQUENCE:\n\n"
+    output.append("🚨 RECOMMENDED CLEANUP SEQUENCE:")
+    output.append("")
     
     # Priority order based on safety and impact
     sequence = [
@@ -392,14 +538,16 @@ def do_get_emergency_workflow(current_percent: Optional[int] = None) -> str:
     total_expected = 0
     for proc_id, priority in sequence:
         proc = CLEANUP_PROCEDURES[proc_id]
-        output += f"  {priority}\n"
-        output += f"    → {proc['name']}: ~{proc['typical_space_gb']} GB\n"
+        output.append(f"  {priority}")
+        output.append(f"    → {proc['name']}: ~{proc['typical_space_gb']} GB")
         total_expected += proc['typical_space_gb']
     
-    output += f"\n💾 Total Expected Recovery: ~{total_expected:.1f} GB\n"
-    output += f"📉 Estimated Final: ~{current_percent - (total_expected/2.28):.0f}%\n"
-    output += "\n🔒 PERMISSION REQUIRED for each cleanup step!"
-    return output
+    output.append("")
+    output.append(f"💾 Total Expected Recovery: ~{total_expected:.1f} GB")
+    output.append(f"📉 Estimated Final: ~{current_percent - (total_expected/2.28):.0f}%")
+    output.append("")
+    output.append("🔒 PERMISSION REQUIRED for each cleanup step!")
+    return "\n".join(output)
 
 
 def do_execute_cleanup(procedure: str, confirm: bool) -> str:
@@ -426,11 +574,12 @@ To execute, call again with confirm=true
     output += f"Running...\n\n"
     
     # Execute the command
-    result = run_cmd(proc['command'], timeout=120)
+    result = run_cmd_tail(proc['command'], timeout=120)
     
     output += f"Output:\n{result}\n\n"
     
     # Check new disk status
+    _invalidate_disk_snapshot()
     new_percent = get_disk_percent()
     output += f"✅ Cleanup complete!\n"
     output += f"Current disk usage: {new_percent}%"
@@ -438,103 +587,163 @@ To execute, call again with confirm=true
     return output
 
 
+def _run_app_scan():
+    try:
+        run_cmd(APP_SCAN_CMD)
+    finally:
+        _APP_SCAN["running"] = False
+
+def _refresh_app_scan():
+    """Run app_manager.sh scan at most once per APP_SCAN_TTL.
+
+    The first scan runs inline so there is something to report; later ones run
+    on a background thread while the caller reads what is already on disk.
+    """
+    now = time.monotonic()
+    with _APP_SCAN_LOCK:
+        if _APP_SCAN["running"]:
+            return
+        if _APP_SCAN["t"] is not None and now - _APP_SCAN["t"] < APP_SCAN_TTL:
+            return
+        first = _APP_SCAN["t"] is None
+        _APP_SCAN.update(t=now, running=True)
+    if first:
+        _run_app_scan()
+    else:
+        threading.Thread(target=_run_app_scan, daemon=True).start()
+
+def _count_lines(text: str) -> int:
+    """Number of lines in text, ignoring leading/trailing blank lines"""
+    text = text.strip()
+    return text.count('\n') + 1 if text else 0
+
 def do_get_app_status() -> str:
     """Get application approval status"""
-    output = "=== APPLICATION STATUS ===\n\n"
-    
-    approved_file = DISK_MONITOR_DIR / "approved_apps.txt"
-    pending_file = DISK_MONITOR_DIR / "pending_apps.txt"
+    output = ["=== APPLICATION STATUS ===", ""]
     
-    # Run app_manager.sh to refresh status
-    run_cmd(f"{DISK_MONITOR_DIR}/app_manager.sh scan 2>/dev/null")
+    # Refresh status via app_manager.sh (rate-limited, see _refresh_app_scan)
+    _refresh_app_scan()
     
     # Count apps
     approved_count = 0
     pending_count = 0
+    pending_text = ""
     
-    if approved_file.exists():
-        approved_count = len(approved_file.read_text().strip().split('\n'))
+    if APPROVED_FILE.exists():
+        approved_count = _count_lines(APPROVED_FILE.read_text())
     
-    if pending_file.exists():
-        pending_text = pending_file.read_text().strip()
-        if pending_text:
-            pending_count = len(pending_text.split('\n'))
+    if PENDING_FILE.exists():
+        pending_text = PENDING_FILE.read_text()
+        pending_count = _count_lines(pending_text)
     
-    output += f"📊 Summary:\n"
-    output += f"   Approved: {approved_count} apps\n"
-    output += f"   Pending: {pending_count} apps\n\n"
+    output.append("📊 Summary:")
+    output.append(f"   Approved: {approved_count} apps")
+    output.append(f"   Pending: {pending_count} apps")
+    output.append("")
     
     if pending_count > 0:
-        output += "⚠️ PENDING APPROVAL:\n"
-        for line in pending_file.read_text().strip().split('\n'):
+        output.append("⚠️ PENDING APPROVAL:")
+        for line in pending_text.splitlines():
             if line:
                 parts = line.split('|')
                 if len(parts) >= 3:
-                    output += f"   • {parts[0]} ({parts[1]}) - Installed: {parts[2]}\n"
-        output += "\nUse approve_app to approve pending applications."
+                    output.append(f"   • {parts[0]} ({parts[1]}) - Installed: {parts[2]}")
+        output.append("")
+        output.append("Use approve_app to approve pending applications.")
     else:
-        output += "✅ All applications are approved!"
-    
-    return output
+        output.append("✅ All applications are approved!")
+    
+    return "\n".join(output)
+
+def _find_line_spans(mm, prefix: bytes) -> List[tuple]:
+    """(start, end) byte spans of every line in mm starting with prefix, newline included"""
+    needle = b"\n" + prefix
+    starts = [0] if mm[:len(prefix)] == prefix else []
+    idx = mm.find(needle)
+    while idx != -1:
+        starts.append(idx + 1)
+        idx = mm.find(needle, idx + 1)
+    spans = []
+    for start in starts:
+        end = mm.find(b"\n", start)
+        spans.append((start, len(mm) if end == -1 else end + 1))
+    return spans
 
 def do_approve_app(app_name: str) -> str:
     """Approve a pending application"""
-    pending_file = DISK_MONITOR_DIR / "pending_apps.txt"
-    approved_file = DISK_MONITOR_DIR / "approved_apps.txt"
-    
-    if not pending_file.exists():
+    with _APPROVE_LOCK:
+        return _approve_app(app_name)
+
+def _approve_app(app_name: str) -> str:
+    if not PENDING_FILE.exists():
         return "❌ No pending apps file found. Run get_app_status first."
     
-    pending_text = pending_file.read_text()
-    found_line = None
-    
-    for line in pending_text.strip().split('\n'):
-        if line.startswith(f"{app_name}|"):
-            found_line = line
-            break
-    
-    if not found_line:
-        return f"❌ App '{app_name}' not found in pending list."
-    
-    # Add to approved
-    with open(approved_file, 'a') as f:
-        f.write(found_line + '\n')
-    
-    # Remove from pending
-    new_pending = '\n'.join(l for l in pending_text.strip().split('\n') if not l.startswith(f"{app_name}|"))
-    pending_file.write_text(new_pending)
+    with open(PENDING_FILE, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return f"❌ App '{app_name}' not found in pending list."
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            spans = _find_line_spans(mm, f"{app_name}|".encode())
+            if not spans:
+                return f"❌ App '{app_name}' not found in pending list."
+            
+            # Add to approved
+            found_line = mm[spans[0][0]:spans[0][1]].rstrip(b"\r\n")
+            with open(APPROVED_FILE, 'ab') as out:
+                out.write(found_line + b'\n')
+            
+            # Remove from pending: stream everything but the matched lines, then swap atomically
+            with open(PENDING_TMP_FILE, 'wb') as out:
+                pos = 0
+                for start, end in spans:
+                    out.write(mm[pos:start])
+                    pos = end
+                out.write(mm[pos:])
+    os.replace(PENDING_TMP_FILE, PENDING_FILE)
     
     return f"✅ Approved: {app_name}"
 
 
+def _tail_bytes(path: Path, n: int) -> bytes:
+    """Raw bytes of the last n lines of a file, read backwards in TAIL_CHUNK steps"""
+    if n <= 0:
+        return b""
+    with open(path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        buf = b""
+        # n+1 newlines guarantee the last n lines are complete
+        while pos > 0 and buf.strip().count(b"\n") < n:
+            step = min(TAIL_CHUNK, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+    buf = buf.strip()
+    start = len(buf)
+    for _ in range(n):
+        start = buf.rfind(b"\n", 0, start)
+        if start == -1:
+            break
+    return buf[start + 1:]
+
 def do_get_history(days: int = 7) -> str:
     """Get disk usage history"""
-    output = "=== DISK USAGE HISTORY ===\n\n"
-    
-    log_file = DISK_MONITOR_DIR / "disk_usage.log"
+    output = ["=== DISK USAGE HISTORY ===", ""]
     
-    if not log_file.exists():
+    if not HISTORY_LOG.exists():
         return "❌ No history file found. Run daily_disk_check.sh to start logging."
     
-    lines = log_file.read_text().strip().split('\n')
-    recent_lines = lines[-days:] if len(lines) > days else lines
+    recent = _tail_bytes(HISTORY_LOG, days)
+    entry_count = recent.count(b"\n") + 1 if recent else 0
     
-    output += f"📈 Last {len(recent_lines)} entries:\n\n"
+    output.append(f"📈 Last {entry_count} entries:")
+    output.append("")
+    output.extend(
+        f"   {date_time.decode(errors='replace')}: {int(usage_kb) / 1048576:.1f} GB"
+        for date_time, usage_kb in _HISTORY_ROW_RE.findall(recent)
+    )
     
-    for line in recent_lines:
-        if ',' in line:
-            parts = line.split(',')
-            if len(parts) >= 2:
-                date_time = parts[0]
-                try:
-                    usage_kb = int(parts[1])
-                    usage_gb = usage_kb / 1048576
-                    output += f"   {date_time}: {usage_gb:.1f} GB\n"
-                except:
-                    pass
-    
-    output += "\n💡 Run daily_disk_check.sh regularly for accurate trends."
-    return output
+    output.append("")
+    output.append("💡 Run daily_disk_check.sh regularly for accurate trends.")
+    return "\n".join(output)
 
 # ============== MAIN ==============
 
@@ -544,7 +753,4 @@ async def main():
         await server.run(r, w, server.create_initialization_options())
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1 and sys.argv[1] in ["--help", "-h"]:
-        print(__doc__)
-    else:
-        asyncio.run(main())
+    asyncio.run(main())
@@ -20,20 +20,31 @@ Environment Variables (Optional):
 """
 
 import asyncio
+import atexit
+import functools
+import inspect
 import json
 import logging
 import os
+import shlex
 import shutil
 import subprocess
 import sys
-from datetime import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from mcp.server import Server
 from mcp.types import Tool, TextContent
 from pydantic import BaseModel, Field, field_validator
 
+try:
+    import uvloop  # optional: faster event loop / subprocess transport
+except ImportError:
+    uvloop = None
+
 # ============== LOGGING SETUP ==============
 
 LOG_LEVEL = os.environ.get("GIT_MANAGER_LOG_LEVEL", "INFO").upper()
@@ -49,62 +60,58 @@ SKILL_NAME = os.environ.get("MCP_SKILL_NAME", "git_manager")
 server = Server(SKILL_NAME)
 
 # ============== PATH RESOLUTION ==============
-# GIT_MANAGER_REPO_ROOT is REQUIRED - no auto-detection
-
-_env_repo_root = os.environ.get("GIT_MANAGER_REPO_ROOT")
-if not _env_repo_root:
-    logger.error("GIT_MANAGER_REPO_ROOT environment variable is required but not set.")
-    logger.error("Set it to your monorepo root path in your MCP configuration.")
-    logger.error("Example: /path/to/your-project-monorepo")
-    print(json.dumps({
-        "error": "GIT_MANAGER_REPO_ROOT environment variable is required",
-        "help": "Set GIT_MANAGER_REPO_ROOT to your monorepo root path in your MCP configuration"
-    }), file=sys.stderr)
-    sys.exit(1)
-
-REPO_ROOT = Path(_env_repo_root).resolve()
-if not REPO_ROOT.exists():
-    logger.error(f"GIT_MANAGER_REPO_ROOT path does not exist: {REPO_ROOT}")
-    sys.exit(1)
-if not (REPO_ROOT / ".git").exists() and not any(REPO_ROOT.glob("*/.git")):
-    logger.error(f"GIT_MANAGER_REPO_ROOT does not appear to be a git repository: {REPO_ROOT}")
-    sys.exit(1)
-
-logger.info(f"Using REPO_ROOT: {REPO_ROOT}")
-
-# Configurable timeout
-DEFAULT_TIMEOUT = int(os.environ.get("GIT_MANAGER_TIMEOUT", "60"))
-
-
-def find_dev_worktree() -> Path:
-    """Find the dev worktree dynamically from git worktree list."""
-    result = subprocess.run(
-        ["git", "worktree", "list", "--porcelain"],
-        cwd=str(REPO_ROOT),
-        text=True,
-        capture_output=True,
-        timeout=30
-    )
-    if result.returncode != 0:
+# GIT_MANAGER_REPO_ROOT is REQUIRED - no auto-detection.
+# Resolved on first use (and checked once at startup in main()), so importing
+# this module doesn't touch the environment or the filesystem.
+
+@functools.cache
+def repo_root() -> Path:
+    """Monorepo root from GIT_MANAGER_REPO_ROOT, validated on first use."""
+    env_repo_root = os.environ.get("GIT_MANAGER_REPO_ROOT")
+    if not env_repo_root:
+        raise RuntimeError("GIT_MANAGER_REPO_ROOT environment variable is required but not set")
+    root = Path(env_repo_root).resolve()
+    if not root.exists():
+        raise RuntimeError(f"GIT_MANAGER_REPO_ROOT path does not exist: {root}")
+    if not (root / ".git").exists() and not any(root.glob("*/.git")):
+        raise RuntimeError(f"GIT_MANAGER_REPO_ROOT does not appear to be a git repository: {root}")
+    logger.info(f"Using REPO_ROOT: {root}")
+    return root
+
+@functools.cache
+def default_timeout() -> int:
+    """Git command timeout in seconds (GIT_MANAGER_TIMEOUT, default 60)."""
+    return int(os.environ.get("GIT_MANAGER_TIMEOUT", "60"))
+
+# Max concurrent network operations when fanning out over worktrees
+PULL_CONCURRENCY = 8
+# Threads used to write .env copies into feature worktrees
+SYNC_ENV_WORKERS = 8
+
+
+@functools.cache
+def dev_worktree() -> Path:
+    """Find the dev worktree dynamically from git worktree list (once per process)."""
+    root = repo_root()
+    try:
+        worktrees = load_worktrees(root)
+    except RuntimeError:
         logger.warning("Could not list worktrees to find dev")
-        return REPO_ROOT
+        return root
     
-    for line in result.stdout.split('\n'):
-        if line.startswith('worktree '):
-            path = Path(line.split(' ', 1)[1])
-            if '-dev' in path.name or path.name.endswith('-dev'):
-                return path
+    for wt_path in worktrees:
+        path = Path(wt_path)
+        if '-dev' in path.name or path.name.endswith('-dev'):
+            logger.info(f"Dev worktree: {path}")
+            return path
     
     # Fallback: look for *-dev directory in REPO_ROOT
-    for child in REPO_ROOT.iterdir():
+    for child in root.iterdir():
         if child.is_dir() and child.name.endswith('-dev'):
+            logger.info(f"Dev worktree: {child}")
             return child
     
-    return REPO_ROOT
-
-# For backwards compatibility - evaluated at startup
-DEV_WORKTREE = find_dev_worktree()
-logger.info(f"Dev worktree: {DEV_WORKTREE}")
+    return root
 
 
 # ============== HELPER FUNCTIONS ==============
@@ -170,23 +177,193 @@ def add_to_ci_monitor(repo_path: Path) -> Optional[str]:
         return None
 
 
-def run_git(args: List[str], cwd: Path = None, timeout: int = None) -> subprocess.CompletedProcess:
-    """Run a git command and return the result."""
-    if timeout is None:
-        timeout = DEFAULT_TIMEOUT
+# ============== NETWORK CIRCUIT BREAKER ==============
+# fetch/pull/push against a dead remote would block for the full timeout on
+# every call. Per (worktree, command) we keep the usual duration to size the
+# timeout, and stop trying after repeated remote failures.
+
+NETWORK_COMMANDS = {"fetch", "pull", "push"}
+CIRCUIT_FAILURE_LIMIT = 3
+CIRCUIT_COOLDOWN = 300  # seconds before an open circuit lets one attempt through
+MIN_NETWORK_TIMEOUT = 15
+
+# stderr fragments that mean the remote itself is unreachable (not e.g. a missing ref)
+_REMOTE_DOWN_MARKERS = (
+    "timed out",
+    "Could not read from remote",
+    "unable to access",
+    "Could not resolve host",
+    "Connection refused",
+)
+
+class RunStats:
+    """Rolling duration and consecutive remote-failure count for one network command."""
+    
+    def __init__(self):
+        self.avg: Optional[float] = None
+        self.failures = 0
+        self.opened_at = 0.0
+    
+    def is_open(self) -> bool:
+        return (self.failures >= CIRCUIT_FAILURE_LIMIT
+                and time.monotonic() - self.opened_at < CIRCUIT_COOLDOWN)
+    
+    def timeout(self) -> int:
+        """A few times the usual duration, never above GIT_MANAGER_TIMEOUT."""
+        if self.avg is None:
+            return default_timeout()
+        return min(default_timeout(), max(MIN_NETWORK_TIMEOUT, int(self.avg * 4) + 1))
+    
+    def record(self, seconds: float, result: subprocess.CompletedProcess) -> None:
+        if result.returncode != 0 and any(m in result.stderr for m in _REMOTE_DOWN_MARKERS):
+            self.failures += 1
+            if self.failures >= CIRCUIT_FAILURE_LIMIT:
+                self.opened_at = time.monotonic()
+            # A timeout means our estimate was too low; let the next try run longer
+            seconds = max(seconds, self.timeout())
+        else:
+            self.failures = 0
+        self.avg = seconds if self.avg is None else 0.8 * self.avg + 0.2 * seconds
+
+_RUN_STATS: Dict[tuple, RunStats] = {}
+
+def network_stats(args: List[str], cwd: Path = None) -> Optional[RunStats]:
+    """RunStats for a network git command, or None for local commands."""
+    if not args or args[0] not in NETWORK_COMMANDS:
+        return None
+    key = (str(cwd or repo_root()), args[0])
+    stats = _RUN_STATS.get(key)
+    if stats is None:
+        stats = _RUN_STATS[key] = RunStats()
+    return stats
+
+def circuit_open_result(cmd: List[str]) -> subprocess.CompletedProcess:
+    return subprocess.CompletedProcess(
+        cmd, 1, "",
+        f"(skipped — circuit open after {CIRCUIT_FAILURE_LIMIT} remote failures; run reset_circuit to retry now)",
+    )
+
+def run_git(args: List[str], cwd: Path = None, timeout: int = None,
+            text: bool = True, input: Optional[str] = None) -> subprocess.CompletedProcess:
+    """Run a git command and return the result (raw bytes when text=False)."""
     cmd = ["git"] + args
-    logger.debug(f"Running: {' '.join(cmd)} in {cwd or REPO_ROOT}")
+    stats = network_stats(args, cwd)
+    if stats is not None and stats.is_open():
+        return circuit_open_result(cmd)
+    if timeout is None:
+        timeout = stats.timeout() if stats else default_timeout()
+    logger.debug(f"Running: {' '.join(cmd)} in {cwd or repo_root()}")
+    started = time.monotonic()
+    # close_fds=False throughout: every fd we open is non-inheritable (PEP 446),
+    # so the child-side close-all-fds pass on each spawn buys nothing
+    try:
+        result = subprocess.run(
+            cmd,
+            cwd=str(cwd or repo_root()),
+            text=text,
+            input=input,
+            capture_output=True,
+            timeout=timeout,
+            close_fds=False,
+        )
+    except subprocess.TimeoutExpired:
+        if stats:
+            stats.record(timeout, subprocess.CompletedProcess(cmd, 1, "", "timed out"))
+        raise
+    if stats:
+        stats.record(time.monotonic() - started, result)
+    if result.returncode != 0:
+        logger.warning(f"Git command failed: {' '.join(cmd)} -> {os.fsdecode(result.stderr).strip()}")
+    return result
+
+def run_git_short(args: List[str], cwd: Path = None, timeout: int = None) -> Optional[str]:
+    """Run a git command whose small stdout is all we need.
+    
+    Returns stripped stdout, or None if git failed. stderr is discarded, so
+    use run_git for anything whose errors should reach the user.
+    """
+    if timeout is None:
+        timeout = default_timeout()
+    try:
+        return subprocess.check_output(
+            ["git"] + args,
+            cwd=str(cwd or repo_root()),
+            stderr=subprocess.DEVNULL,
+            text=True,
+            timeout=timeout,
+            close_fds=False,
+        ).strip()
+    except subprocess.CalledProcessError as e:
+        logger.debug(f"Git command failed: git {' '.join(args)} (exit {e.returncode})")
+        return None
+
+def run_git_pipeline(cmds: List[List[str]], cwd: Path = None, best_effort: int = 0,
+                     timeout: int = None) -> subprocess.CompletedProcess:
+    """Run several git commands in a single shell, stopping at the first failure.
+    
+    The first `best_effort` commands are preparation steps (fetch/pull) whose
+    failure is reported in the output but does not stop the chain.
+    """
+    if timeout is None:
+        timeout = default_timeout() * len(cmds)
+    lines = [shlex.join(["git"] + c) for c in cmds]
+    script = "".join(f"{line}; " for line in lines[:best_effort]) + " && ".join(lines[best_effort:])
+    logger.debug(f"Running: {script} in {cwd or repo_root()}")
     result = subprocess.run(
-        cmd,
-        cwd=str(cwd or REPO_ROOT),
+        ["sh", "-c", script],
+        cwd=str(cwd or repo_root()),
         text=True,
         capture_output=True,
         timeout=timeout,
+        close_fds=False,
     )
+    if result.returncode != 0:
+        logger.warning(f"Git pipeline failed: {script} -> {result.stderr.strip()}")
+    return result
+
+async def run_git_async(args: List[str], cwd: Path = None, timeout: int = None) -> subprocess.CompletedProcess:
+    """Run a git command without blocking the event loop; same result shape as run_git."""
+    cmd = ["git"] + args
+    stats = network_stats(args, cwd)
+    if stats is not None and stats.is_open():
+        return circuit_open_result(cmd)
+    if timeout is None:
+        timeout = stats.timeout() if stats else default_timeout()
+    logger.debug(f"Running: {' '.join(cmd)} in {cwd or repo_root()}")
+    started = time.monotonic()
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        cwd=str(cwd or repo_root()),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        close_fds=False,
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        stdout, stderr = b"", f"timed out after {timeout}s".encode()
+    result = subprocess.CompletedProcess(cmd, proc.returncode, stdout.decode(), stderr.decode())
+    if stats:
+        stats.record(time.monotonic() - started, result)
     if result.returncode != 0:
         logger.warning(f"Git command failed: {' '.join(cmd)} -> {result.stderr.strip()}")
     return result
 
+# Read-only tool calls currently running, keyed by (tool, target). A burst of
+# identical requests awaits the same run instead of re-running git for each.
+_INFLIGHT: Dict[tuple, asyncio.Future] = {}
+
+async def run_deduped(key: tuple, func, *args) -> str:
+    """Run a blocking tool body in a thread, sharing it with concurrent identical calls."""
+    fut = _INFLIGHT.get(key)
+    if fut is None:
+        fut = _INFLIGHT[key] = asyncio.ensure_future(asyncio.to_thread(func, *args))
+        fut.add_done_callback(lambda _: _INFLIGHT.pop(key, None))
+    # shield: one caller being cancelled must not cancel the run for the others
+    return await asyncio.shield(fut)
+
 def format_result(proc: subprocess.CompletedProcess) -> str:
     """Format command result for output."""
     parts = []
@@ -198,20 +375,210 @@ def format_result(proc: subprocess.CompletedProcess) -> str:
         parts.append(f"exit code: {proc.returncode}")
     return "\n".join(parts) if parts else "(no output)"
 
+# Current branch per worktree; HEAD doesn't move during a tool call unless we
+# check out something ourselves. Cleared at the top of call_tool.
+_BRANCH_CACHE: Dict[str, str] = {}
+
 def get_current_branch(cwd: Path = None) -> str:
     """Get current branch name."""
-    result = run_git(["branch", "--show-current"], cwd)
-    return result.stdout.strip()
+    key = str(cwd or repo_root())
+    branch = _BRANCH_CACHE.get(key)
+    if branch is None:
+        branch = _BRANCH_CACHE[key] = run_git_short(["branch", "--show-current"], cwd) or ""
+    return branch
+
+class GitBatch:
+    """Long-running 'git cat-file --batch-check' child for one repository.
+    
+    Each lookup is a line written to stdin and a line read back, so ref
+    checks cost a pipe round-trip instead of a git fork+exec. Refs are
+    resolved at lookup time, so branch creates/deletes are seen immediately.
+    """
+    
+    def __init__(self, cwd: str):
+        self.cwd = cwd
+        self.proc: Optional[subprocess.Popen] = None
+    
+    def _spawn(self) -> subprocess.Popen:
+        if self.proc is None or self.proc.poll() is not None:
+            self.proc = subprocess.Popen(
+                ["git", "cat-file", "--batch-check=%(objectname) %(objecttype)"],
+                cwd=self.cwd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                bufsize=1,
+                close_fds=False,
+            )
+        return self.proc
+    
+    def lookup(self, rev: str) -> Optional[str]:
+        """Return the object name `rev` resolves to, or None if it is missing."""
+        proc = self._spawn()
+        try:
+            proc.stdin.write(rev + "\n")
+            proc.stdin.flush()
+            reply = proc.stdout.readline().split()
+        except (BrokenPipeError, OSError) as e:
+            logger.warning(f"git cat-file in {self.cwd} died: {e}")
+            self.close()
+            return None
+        if len(reply) != 2 or reply[-1] == "missing":
+            return None
+        return reply[0]
+    
+    def close(self) -> None:
+        if self.proc is not None:
+            try:
+                self.proc.stdin.close()
+                self.proc.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self.proc.kill()
+            self.proc = None
+
+_GIT_BATCHES: Dict[str, GitBatch] = {}
+
+def git_batch(cwd: Path = None) -> GitBatch:
+    """Get the persistent cat-file process for a repo, starting it on first use."""
+    key = str(cwd or repo_root())
+    batch = _GIT_BATCHES.get(key)
+    if batch is None:
+        batch = _GIT_BATCHES[key] = GitBatch(key)
+    return batch
+
+@atexit.register
+def close_git_batches() -> None:
+    for batch in _GIT_BATCHES.values():
+        batch.close()
 
 def branch_exists(branch: str, cwd: Path = None) -> bool:
     """Check if a branch exists locally."""
-    result = run_git(["show-ref", "--verify", f"refs/heads/{branch}"], cwd)
-    return result.returncode == 0
+    return git_batch(cwd).lookup(f"refs/heads/{branch}") is not None
+
+def parse_status_v2(raw: str) -> Tuple[Dict[str, str], List[Tuple[str, str, Optional[str]]]]:
+    """Parse 'git status --porcelain=v2 -z --branch' output.
+    
+    Returns (headers, changes). headers maps "branch.head", "branch.oid", ... to
+    their values; changes are (XY, path, orig_path) with XY spelled as in
+    --short output ("??" for untracked) and orig_path set only for renames/copies.
+    """
+    headers: Dict[str, str] = {}
+    changes: List[Tuple[str, str, Optional[str]]] = []
+    records = iter(raw.split("\0"))
+    for record in records:
+        kind = record[:1]
+        if kind == "#":
+            key, _, value = record[2:].partition(" ")
+            headers[key] = value
+        elif kind == "1":
+            fields = record.split(" ", 8)
+            changes.append((fields[1].replace(".", " "), fields[8], None))
+        elif kind == "2":
+            # Renames/copies carry the original path as the next NUL record
+            fields = record.split(" ", 9)
+            changes.append((fields[1].replace(".", " "), fields[9], next(records, None)))
+        elif kind == "u":
+            fields = record.split(" ", 10)
+            changes.append((fields[1], fields[10], None))
+        elif kind == "?":
+            changes.append(("??", record[2:], None))
+    return headers, changes
+
+def auto_commit_message(changes: List[Tuple[str, str, Optional[str]]]) -> str:
+    """Build a 'wip: Update a, b, c and N others' message from parsed status entries."""
+    file_summary = ", ".join(path for _, path, _ in changes[:3])
+    if len(changes) > 3:
+        file_summary += f" and {len(changes)-3} others"
+    return f"wip: Update {file_summary}"
+
+def get_status_v2(cwd: Path = None) -> Tuple[Dict[str, str], List[Tuple[str, str, Optional[str]]]]:
+    """Run one porcelain v2 status for branch + changes; also primes _BRANCH_CACHE."""
+    result = run_git(["status", "--porcelain=v2", "-z", "--branch"], cwd)
+    if result.returncode != 0:
+        raise RuntimeError(format_result(result))
+    headers, changes = parse_status_v2(result.stdout)
+    head = headers.get("branch.head", "")
+    _BRANCH_CACHE[str(cwd or repo_root())] = "" if head == "(detached)" else head
+    return headers, changes
+
+# Porcelain prefixes, compared against raw bytes so only the values get decoded
+_WT_PREFIX = b"worktree "
+_HEAD_PREFIX = b"HEAD "
+_BRANCH_PREFIX = b"branch "
+_HEADS_PREFIX = b"refs/heads/"
+
+def load_worktrees(cwd: Path = None) -> Dict[str, dict]:
+    """Parse 'git worktree list --porcelain' into {path: {"head", "branch", "bare"}}."""
+    result = run_git(["worktree", "list", "--porcelain"], cwd, text=False)
+    if result.returncode != 0:
+        raise RuntimeError(format_result(subprocess.CompletedProcess(
+            result.args, result.returncode, os.fsdecode(result.stdout), os.fsdecode(result.stderr))))
+    worktrees: Dict[str, dict] = {}
+    current = None
+    for line in result.stdout.splitlines():
+        if line.startswith(_WT_PREFIX):
+            current = worktrees[os.fsdecode(line[len(_WT_PREFIX):])] = {}
+        elif current is None:
+            continue
+        elif line.startswith(_HEAD_PREFIX):
+            current["head"] = line[len(_HEAD_PREFIX):].decode()
+        elif line.startswith(_BRANCH_PREFIX):
+            ref = line[len(_BRANCH_PREFIX):]
+            if ref.startswith(_HEADS_PREFIX):
+                ref = ref[len(_HEADS_PREFIX):]
+            current["branch"] = os.fsdecode(ref)
+        elif line == b"bare":
+            current["bare"] = True
+    return worktrees
+
+# Concurrent worktree add/remove/prune race on .git/worktrees/ ("failed to read
+# commondir"). A threading lock, since list_worktrees runs in a worker thread.
+WORKTREE_MUTATE_LOCK = threading.Lock()
 
 def prune_worktrees() -> None:
     """Prune stale worktree references to prevent git errors."""
     logger.debug("Pruning stale worktree references...")
-    run_git(["worktree", "prune"])
+    with WORKTREE_MUTATE_LOCK:
+        run_git(["worktree", "prune"])
+
+_COMMON_DIR: Optional[Path] = None  # the shared .git directory, resolved on first use
+
+def has_stale_worktrees() -> bool:
+    """Cheaply check whether 'git worktree prune' would have anything to do.
+    
+    Each .git/worktrees/<id>/gitdir names the worktree's .git file; an entry is
+    stale when that file (or the gitdir record itself) is gone.
+    """
+    global _COMMON_DIR
+    if _COMMON_DIR is None:
+        git_dir = repo_root() / ".git"
+        if not git_dir.is_dir():
+            # REPO_ROOT is itself a linked worktree; ask git once where the admin dir is
+            found = run_git_short(["rev-parse", "--path-format=absolute", "--git-common-dir"])
+            if not found:
+                return True
+            git_dir = Path(found)
+        _COMMON_DIR = git_dir
+    try:
+        entries = os.scandir(_COMMON_DIR / "worktrees")
+    except FileNotFoundError:
+        return False
+    with entries:
+        for entry in entries:
+            try:
+                target = Path(entry.path, "gitdir").read_text().strip()
+            except OSError:
+                return True
+            # Relative records (worktree.useRelativePaths) are relative to the entry
+            if not os.path.exists(os.path.join(entry.path, target)):
+                return True
+    return False
+
+def maybe_prune_worktrees() -> None:
+    """Prune only when a worktree directory has disappeared, saving a git exec."""
+    if has_stale_worktrees():
+        prune_worktrees()
 
 
 # ============== ARGUMENT MODELS ==============
@@ -335,8 +702,12 @@ TOOLS = {
         "description": "Pull latest changes in all worktrees (main, dev, features).",
         "schema": EmptyArgs,
     },
+    "reset_circuit": {
+        "description": "Clear remote-failure tracking so skipped fetch/pull/push commands run again.",
+        "schema": EmptyArgs,
+    },
     "git_add_commit_push": {
-        "description": "Stage all changes (git add .), commit, and optionally push.",
+        "description": "Stage every changed and untracked path reported by git status, commit, and optionally push.",
         "schema": CommitPushArgs,
     },
     "create_repo": {
@@ -349,13 +720,17 @@ TOOLS = {
     },
 }
 
+# JSON schemas never change after import; build them once instead of per request
+for _info in TOOLS.values():
+    _info["json_schema"] = _info["schema"].model_json_schema()
+
 @server.list_tools()
 async def list_tools():
     return [
         Tool(
             name=name,
             description=info["description"],
-            inputSchema=info["schema"].model_json_schema(),
+            inputSchema=info["json_schema"],
         )
         for name, info in TOOLS.items()
     ]
@@ -363,44 +738,34 @@ async def list_tools():
 
 # ============== TOOL ROUTER ==============
 
+# name -> handler taking the parsed argument model (schemas come from TOOLS).
+# Handlers may return a str or an awaitable of one.
+HANDLERS = {
+    "list_worktrees": lambda a: run_deduped(("list_worktrees",), do_list_worktrees),
+    "get_status": lambda a: run_deduped(("get_status", a.worktree), do_get_status, a.worktree),
+    "create_feature": lambda a: do_create_feature(a.feature, a.repo_path),
+    "delete_feature": lambda a: do_delete_feature(a.feature, a.repo_path),
+    "merge_feature": lambda a: do_merge_feature(a.feature, a.push, a.delete_branch, a.repo_path),
+    "release_merge": lambda a: do_release_merge(a.push, a.ff_only, a.repo_path),
+    "tag_release": lambda a: do_tag_release(a.version, a.message, a.push),
+    "sync_env": lambda a: do_sync_env(),
+    "pull_all": lambda a: do_pull_all(),
+    "reset_circuit": lambda a: do_reset_circuit(),
+    "git_add_commit_push": lambda a: do_git_add_commit_push(a.message, a.worktree, a.push),
+    "create_repo": lambda a: do_create_repo(a.path, a.name, a.public, a.description),
+    "get_help": lambda a: do_get_help(a.tool_name),
+}
+
 @server.call_tool()
 async def call_tool(name: str, arguments: dict):
+    _BRANCH_CACHE.clear()
+    handler = HANDLERS.get(name)
+    if handler is None:
+        return [TextContent(type="text", text=f"Unknown tool: {name}")]
     try:
-        if name == "list_worktrees":
-            result = do_list_worktrees()
-        elif name == "get_status":
-            args = StatusArgs(**arguments)
-            result = do_get_status(args.worktree)
-        elif name == "create_feature":
-            args = FeatureArgs(**arguments)
-            result = do_create_feature(args.feature, args.repo_path)
-        elif name == "delete_feature":
-            args = FeatureArgs(**arguments)
-            result = do_delete_feature(args.feature, args.repo_path)
-        elif name == "merge_feature":
-            args = MergeFeatureArgs(**arguments)
-            result = do_merge_feature(args.feature, args.push, args.delete_branch, args.repo_path)
-        elif name == "release_merge":
-            args = ReleaseMergeArgs(**arguments)
-            result = do_release_merge(args.push, args.ff_only, args.repo_path)
-        elif name == "tag_release":
-            args = TagArgs(**arguments)
-            result = do_tag_release(args.version, args.message, args.push)
-        elif name == "sync_env":
-            result = do_sync_env()
-        elif name == "pull_all":
-            result = do_pull_all()
-        elif name == "git_add_commit_push":
-            args = CommitPushArgs(**arguments)
-            result = do_git_add_commit_push(args.message, args.worktree, args.push)
-        elif name == "create_repo":
-            args = CreateRepoArgs(**arguments)
-            result = do_create_repo(args.path, args.name, args.public, args.description)
-        elif name == "get_help":
-            args = HelpArgs(**arguments)
-            result = do_get_help(args.tool_name)
-        else:
-            result = f"Unknown tool: {name}"
+        result = handler(TOOLS[name]["schema"](**(arguments or {})))
+        if inspect.isawaitable(result):
+            result = await result
         return [TextContent(type="text", text=result)]
     except Exception as e:
         return [TextContent(type="text", text=f"Error: {str(e)}")]
@@ -411,35 +776,19 @@ async def call_tool(name: str, arguments: dict):
 def do_list_worktrees() -> str:
     """List all worktrees."""
     # Prune stale references first for accurate listing
-    prune_worktrees()
+    maybe_prune_worktrees()
     
     output = ["=== GIT WORKTREES ===\n"]
     
     # Get worktree list
-    wt_result = run_git(["worktree", "list", "--porcelain"])
-    if wt_result.returncode != 0:
-        return f"Error listing worktrees: {format_result(wt_result)}"
-    
-    # Parse porcelain output
-    worktrees = []
-    current_wt = {}
-    for line in wt_result.stdout.split("\n"):
-        if line.startswith("worktree "):
-            if current_wt:
-                worktrees.append(current_wt)
-            current_wt = {"path": line[9:]}
-        elif line.startswith("HEAD "):
-            current_wt["head"] = line[5:8]  # Short SHA
-        elif line.startswith("branch "):
-            current_wt["branch"] = line[7:].replace("refs/heads/", "")
-        elif line == "bare":
-            current_wt["bare"] = True
-    if current_wt:
-        worktrees.append(current_wt)
+    try:
+        worktrees = load_worktrees()
+    except RuntimeError as e:
+        return f"Error listing worktrees: {e}"
     
     # Format output
-    for wt in worktrees:
-        path = Path(wt.get("path", ""))
+    for wt_path, wt in worktrees.items():
+        path = Path(wt_path)
         branch = wt.get("branch", "detached")
         name = path.name
         output.append(f"📁 {name}")
@@ -457,31 +806,31 @@ def do_list_worktrees() -> str:
 def do_get_status(worktree: Optional[str] = None) -> str:
     """Get git status for a worktree."""
     if worktree:
-        wt_path = REPO_ROOT / f"mcp-skills-hub-{worktree}"
+        wt_path = repo_root() / f"mcp-skills-hub-{worktree}"
         if not wt_path.exists():
-            wt_path = REPO_ROOT / worktree
+            wt_path = repo_root() / worktree
         if not wt_path.exists():
             return f"Worktree not found: {worktree}"
     else:
-        wt_path = DEV_WORKTREE
+        wt_path = dev_worktree()
     
     output = [f"=== STATUS: {wt_path.name} ===\n"]
     
-    # Current branch
+    # Branch and changes from a single status call
+    _, changes = get_status_v2(wt_path)
     branch = get_current_branch(wt_path)
     output.append(f"Branch: {branch}")
     
-    # Status
-    status = run_git(["status", "--short"], wt_path)
-    if status.stdout.strip():
-        output.append(f"\nChanges:\n{status.stdout}")
+    if changes:
+        lines = [f"{xy} {orig} -> {path}" if orig else f"{xy} {path}" for xy, path, orig in changes]
+        output.append("\nChanges:\n" + "\n".join(lines) + "\n")
     else:
         output.append("\n✅ Working tree clean")
     
     # Ahead/behind
-    upstream = run_git(["rev-list", "--left-right", "--count", f"{branch}...origin/{branch}"], wt_path)
-    if upstream.returncode == 0 and upstream.stdout.strip():
-        parts = upstream.stdout.strip().split()
+    upstream = run_git_short(["rev-list", "--left-right", "--count", f"{branch}...origin/{branch}"], wt_path)
+    if upstream:
+        parts = upstream.split()
         if len(parts) == 2:
             ahead, behind = int(parts[0]), int(parts[1])
             if ahead > 0:
@@ -523,6 +872,7 @@ def do_create_feature(feature: str, repo_path: Optional[str] = None) -> str:
         # Create and checkout new branch
         output.append(f"Creating branch {branch_name} from {base_branch}...")
         result = run_git(["checkout", "-b", branch_name], repo)
+        _BRANCH_CACHE.pop(str(repo), None)
         if result.returncode != 0:
             return f"❌ Failed to create branch:\n{format_result(result)}"
         
@@ -534,7 +884,7 @@ def do_create_feature(feature: str, repo_path: Optional[str] = None) -> str:
         return "\n".join(output)
     
     # Monorepo mode - use worktrees (original behavior)
-    worktree_path = REPO_ROOT / f"mcp-skills-hub-feature-{feature}"
+    worktree_path = repo_root() / f"mcp-skills-hub-feature-{feature}"
     
     output = [f"=== CREATING FEATURE: {feature} ===\n"]
     
@@ -544,20 +894,23 @@ def do_create_feature(feature: str, repo_path: Optional[str] = None) -> str:
     if branch_exists(branch_name):
         return f"❌ Branch already exists: {branch_name}"
     
-    # Make sure dev is up to date
+    # Update dev (best effort), then create the worktree with a new branch from it.
+    # The fetch is a network round trip, so it stays outside the worktree lock.
     output.append("Updating dev branch...")
-    run_git(["fetch", "origin", "dev"], DEV_WORKTREE)
+    fetch_result = run_git(["fetch", "origin", "dev"], dev_worktree())
+    if fetch_result.returncode != 0:
+        output.append(format_result(fetch_result))
     
-    # Create worktree with new branch from dev
     output.append(f"Creating worktree at {worktree_path}...")
-    result = run_git(["worktree", "add", str(worktree_path), "-b", branch_name, "dev"])
+    with WORKTREE_MUTATE_LOCK:
+        result = run_git(["worktree", "add", str(worktree_path), "-b", branch_name, "dev"])
     if result.returncode != 0:
         return f"❌ Failed to create worktree:\n{format_result(result)}"
     
     output.append(format_result(result))
     
     # Copy .env if exists
-    env_src = DEV_WORKTREE / ".env"
+    env_src = dev_worktree() / ".env"
     if env_src.exists():
         shutil.copy(env_src, worktree_path / ".env")
         output.append("✅ Copied .env from dev")
@@ -586,6 +939,7 @@ def do_delete_feature(feature: str, repo_path: Optional[str] = None) -> str:
         current = get_current_branch(repo)
         if current == branch_name:
             run_git(["checkout", "main"], repo)
+            _BRANCH_CACHE.pop(str(repo), None)
             output.append("Switched to main branch")
         
         # Delete branch
@@ -601,13 +955,14 @@ def do_delete_feature(feature: str, repo_path: Optional[str] = None) -> str:
         return "\n".join(output)
     
     # Monorepo mode - remove worktree and branch
-    worktree_path = REPO_ROOT / f"mcp-skills-hub-feature-{feature}"
+    worktree_path = repo_root() / f"mcp-skills-hub-feature-{feature}"
     
     output = [f"=== DELETING FEATURE: {feature} ===\n"]
     
     # Remove worktree
     if worktree_path.exists():
-        result = run_git(["worktree", "remove", str(worktree_path), "--force"])
+        with WORKTREE_MUTATE_LOCK:
+            result = run_git(["worktree", "remove", str(worktree_path), "--force"])
         if result.returncode == 0:
             output.append(f"✅ Removed worktree: {worktree_path}")
         else:
@@ -626,7 +981,7 @@ def do_delete_feature(feature: str, repo_path: Optional[str] = None) -> str:
         output.append(f"ℹ️  Branch not found: {branch_name}")
     
     # Prune worktree list
-    run_git(["worktree", "prune"])
+    prune_worktrees()
     
     return "\n".join(output)
 
@@ -686,12 +1041,12 @@ def do_merge_feature(feature: str, push: bool, delete_branch: bool, repo_path: O
     
     # Switch to dev and update
     output.append("Switching to dev and pulling...")
-    run_git(["checkout", "dev"], DEV_WORKTREE)
-    run_git(["pull", "origin", "dev"], DEV_WORKTREE)
+    run_git(["checkout", "dev"], dev_worktree())
+    run_git(["pull", "origin", "dev"], dev_worktree())
     
     # Merge feature
     output.append(f"Merging {branch_name}...")
-    result = run_git(["merge", branch_name, "--no-ff", "-m", f"Merge {branch_name} into dev"], DEV_WORKTREE)
+    result = run_git(["merge", branch_name, "--no-ff", "-m", f"Merge {branch_name} into dev"], dev_worktree())
     output.append(format_result(result))
     
     if result.returncode != 0:
@@ -701,7 +1056,7 @@ def do_merge_feature(feature: str, push: bool, delete_branch: bool, repo_path: O
     # Push if requested
     if push:
         output.append("\nPushing dev to origin...")
-        push_result = run_git(["push", "origin", "dev"], DEV_WORKTREE)
+        push_result = run_git(["push", "origin", "dev"], dev_worktree())
         output.append(format_result(push_result))
     
     # Delete branch if requested
@@ -722,24 +1077,15 @@ def do_release_merge(push: bool, ff_only: bool, repo_path: Optional[str] = None)
     output = ["=== RELEASE MERGE: dev → main ===\n"]
     
     # Prune stale worktree references first
-    prune_worktrees()
+    maybe_prune_worktrees()
     
     # Define main worktree path
-    MAIN_WORKTREE = REPO_ROOT / "mcp-skills-hub-main"
+    MAIN_WORKTREE = repo_root() / "mcp-skills-hub-main"
     
     # Verify main worktree exists
     if not MAIN_WORKTREE.exists():
         return f"❌ Main worktree not found at {MAIN_WORKTREE}"
     
-    # Update main
-    output.append("Fetching and updating main...")
-    run_git(["fetch", "origin", "main:main"], MAIN_WORKTREE)
-    run_git(["checkout", "main"], MAIN_WORKTREE)
-    run_git(["pull", "origin", "main"], MAIN_WORKTREE)
-    
-    # Update dev reference
-    run_git(["fetch", "origin", "dev:dev"], MAIN_WORKTREE)
-    
     # Merge dev into main
     merge_cmd = ["merge", "dev"]
     if ff_only:
@@ -747,8 +1093,15 @@ def do_release_merge(push: bool, ff_only: bool, repo_path: Optional[str] = None)
     else:
         merge_cmd.extend(["--no-ff", "-m", "Merge dev into main for release"])
     
+    # Update main and the dev reference, then merge - all in one shell
+    output.append("Fetching and updating main...")
     output.append("Merging dev into main...")
-    result = run_git(merge_cmd, MAIN_WORKTREE)
+    result = run_git_pipeline([
+        ["fetch", "origin", "main:main", "dev:dev"],
+        ["checkout", "main"],
+        ["pull", "origin", "main"],
+        merge_cmd,
+    ], MAIN_WORKTREE, best_effort=3)
     output.append(format_result(result))
     
     if result.returncode != 0:
@@ -772,10 +1125,10 @@ def do_tag_release(version: str, message: Optional[str], push: bool) -> str:
     output = [f"=== TAGGING RELEASE: {version} ===\n"]
     
     # Prune stale worktree references first
-    prune_worktrees()
+    maybe_prune_worktrees()
     
     # Define main worktree path
-    MAIN_WORKTREE = REPO_ROOT / "mcp-skills-hub-main"
+    MAIN_WORKTREE = repo_root() / "mcp-skills-hub-main"
     
     # Verify main worktree exists
     if not MAIN_WORKTREE.exists():
@@ -809,16 +1162,34 @@ def do_sync_env() -> str:
     """Sync .env from dev to all feature worktrees."""
     output = ["=== SYNCING .env FILES ===\n"]
     
-    env_src = DEV_WORKTREE / ".env"
+    env_src = dev_worktree() / ".env"
     if not env_src.exists():
         return "❌ No .env found in dev worktree"
     
-    count = 0
-    for item in REPO_ROOT.iterdir():
-        if item.is_dir() and item.name.startswith("mcp-skills-hub-feature-"):
-            shutil.copy(env_src, item / ".env")
-            output.append(f"✅ Copied to {item.name}")
-            count += 1
+    # scandir answers is_dir() from the dirent; check the cheap name prefix first
+    with os.scandir(repo_root()) as it:
+        feature_dirs = [
+            Path(entry.path) for entry in it
+            if entry.name.startswith("mcp-skills-hub-feature-") and entry.is_dir()
+        ]
+    
+    # Read the source once, then write every copy in parallel (keeping its mode)
+    data = env_src.read_bytes()
+    mode = env_src.stat().st_mode & 0o777
+    
+    def write_env(item: Path) -> None:
+        dst = item / ".env"
+        fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(dst, mode)
+    
+    with ThreadPoolExecutor(max_workers=SYNC_ENV_WORKERS) as ex:
+        list(ex.map(write_env, feature_dirs))
+    
+    for item in feature_dirs:
+        output.append(f"✅ Copied to {item.name}")
+    count = len(feature_dirs)
     
     if count == 0:
         output.append("ℹ️  No feature worktrees found")
@@ -828,27 +1199,28 @@ def do_sync_env() -> str:
     return "\n".join(output)
 
 
-def do_pull_all() -> str:
-    """Pull latest changes in all worktrees."""
+async def do_pull_all() -> str:
+    """Pull latest changes in all worktrees, concurrently."""
     output = ["=== PULLING ALL WORKTREES ===\n"]
     
-    # Get all worktrees
-    wt_result = run_git(["worktree", "list", "--porcelain"])
+    # Get all worktrees with their checked-out branch (detached -> "")
+    try:
+        worktrees = load_worktrees()
+    except RuntimeError as e:
+        return f"Error listing worktrees: {e}"
+    pairs = [(Path(p), wt.get("branch", "")) for p, wt in worktrees.items() if Path(p).exists()]
     
-    worktree_paths = []
-    for line in wt_result.stdout.split("\n"):
-        if line.startswith("worktree "):
-            worktree_paths.append(Path(line[9:]))
+    # Pull everything at once; wall time is the slowest pull, not the sum
+    sem = asyncio.Semaphore(min(PULL_CONCURRENCY, len(pairs) or 1))
     
-    for wt_path in worktree_paths:
-        if not wt_path.exists():
-            continue
-        
-        branch = get_current_branch(wt_path)
+    async def pull(wt_path: Path, branch: str) -> subprocess.CompletedProcess:
+        async with sem:
+            return await run_git_async(["pull", "origin", branch], wt_path)
+    
+    results = await asyncio.gather(*(pull(p, br) for p, br in pairs))
+    
+    for (wt_path, branch), result in zip(pairs, results):
         output.append(f"📁 {wt_path.name} ({branch})")
-        
-        # Pull
-        result = run_git(["pull", "origin", branch], wt_path)
         if result.returncode == 0:
             if "Already up to date" in result.stdout:
                 output.append("   ✅ Already up to date\n")
@@ -860,39 +1232,49 @@ def do_pull_all() -> str:
     return "\n".join(output)
 
 
+def do_reset_circuit() -> str:
+    """Forget network failure/duration history for all worktrees."""
+    tripped = sum(1 for stats in _RUN_STATS.values() if stats.failures >= CIRCUIT_FAILURE_LIMIT)
+    _RUN_STATS.clear()
+    return f"✅ Circuit reset ({tripped} open circuit(s) cleared)"
+
+
 def do_git_add_commit_push(message: Optional[str], worktree: Optional[str], push: bool) -> str:
     """Stage, commit, and push changes in a worktree."""
     # Determine worktree path
     if worktree:
-        wt_path = REPO_ROOT / f"mcp-skills-hub-{worktree}"
+        wt_path = repo_root() / f"mcp-skills-hub-{worktree}"
         if not wt_path.exists():
-            wt_path = REPO_ROOT / worktree
+            wt_path = repo_root() / worktree
         if not wt_path.exists():
             return f"❌ Worktree not found: {worktree}"
     else:
-        wt_path = DEV_WORKTREE
+        wt_path = dev_worktree()
 
     output = [f"=== COMMIT & PUSH: {wt_path.name} ===\n"]
 
-    # Git Add
-    output.append("Staging changes (git add .)...")
-    add_res = run_git(["add", "."], wt_path)
-    if add_res.returncode != 0:
-        return f"❌ Git add failed:\n{format_result(add_res)}"
-
-    # Check validity (status)
-    status = run_git(["status", "--porcelain"], wt_path)
-    if not status.stdout.strip():
+    # Status first: it tells us whether there is anything to commit and which
+    # paths to stage, so git add doesn't have to rescan the whole tree
+    _, changes = get_status_v2(wt_path)
+    if not changes:
         return "ℹ️  Nothing to commit (working tree clean)"
 
+    # Git Add - only paths with unstaged work (worktree column set, or untracked);
+    # index-only entries are already staged and may not exist on disk any more.
+    # Fed on stdin to stay clear of argv limits; :(top,literal) so names are never globs
+    paths = sorted({path for xy, path, _ in changes if xy == "??" or xy[1] != " "})
+    output.append(f"Staging {len(paths)} changed path(s)...")
+    if paths:
+        add_res = run_git(
+            ["add", "--pathspec-from-file=-", "--pathspec-file-nul"], wt_path,
+            input="".join(f":(top,literal){path}\0" for path in paths),
+        )
+        if add_res.returncode != 0:
+            return f"❌ Git add failed:\n{format_result(add_res)}"
+
     # Auto-generate message if missing
     if not message:
-        lines = status.stdout.strip().splitlines()
-        files = [l.strip().split()[-1] for l in lines]
-        file_summary = ", ".join(files[:3])
-        if len(files) > 3:
-            file_summary += f" and {len(files)-3} others"
-        message = f"wip: Update {file_summary}"
+        message = auto_commit_message(changes)
 
     # Git Commit
     output.append(f"Committing with message: '{message}'...")
@@ -1079,14 +1461,14 @@ def do_get_help(tool_name: Optional[str] = None) -> str:
             return f"❌ Unknown tool: {tool_name}"
         
         info = TOOLS[tool_name]
-        schema = info["schema"]
+        schema = info["json_schema"]
         
         output = [f"=== HELP: {tool_name} ==="]
         output.append(info["description"])
         output.append("\nArguments:")
         
-        props = schema.model_json_schema().get("properties", {})
-        required = schema.model_json_schema().get("required", [])
+        props = schema.get("properties", {})
+        required = schema.get("required", [])
         
         for name, prop in props.items():
             req_mark = "*" if name in required else ""
@@ -1107,9 +1489,26 @@ def do_get_help(tool_name: Optional[str] = None) -> str:
 # ============== MAIN ==============
 
 async def main():
+    # Fail fast on a bad configuration rather than on the first tool call
+    try:
+        repo_root()
+    except RuntimeError as e:
+        logger.error(str(e))
+        logger.error("Set it to your monorepo root path in your MCP configuration.")
+        logger.error("Example: /path/to/your-project-monorepo")
+        print(json.dumps({
+            "error": str(e),
+            "help": "Set GIT_MANAGER_REPO_ROOT to your monorepo root path in your MCP configuration"
+        }), file=sys.stderr)
+        sys.exit(1)
+    dev_worktree()
+    
     from mcp.server.stdio import stdio_server
     async with stdio_server() as (read, write):
         await server.run(read, write, server.create_initialization_options())
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
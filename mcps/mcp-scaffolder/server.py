@@ -4,10 +4,15 @@ MCP Scaffolder - Standard Skill Generator
 """
 
 import asyncio
+import functools
 import json
 import os
+import shlex
 import shutil
+import string
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
 from pathlib import Path
 from typing import List, Optional
 
@@ -46,6 +51,11 @@ MONOREPO_ROOT = MCPS_DIR.parent
 
 WORKTREE_ROOT = MCPS_DIR.parent
 
+# Threads used to write the generated files
+WRITE_WORKERS = 8
+# Exit status the add+commit shell uses to report that 'git add' failed
+GIT_ADD_FAILED = 97
+
 # ============== TEMPLATES ==============
 
 TEMPLATE_FEATURE_LIST = """[
@@ -124,6 +134,8 @@ TEMPLATE_TSCONFIG = """{
   "exclude": ["node_modules"]
 }"""
 
+TSCONFIG_BYTES = TEMPLATE_TSCONFIG.encode("utf-8")  # no fields to fill
+
 TEMPLATE_README = """# MCP: {skill_name}
 
 {description}
@@ -188,11 +200,22 @@ await server.connect(transport);
 
 # ============== HELPER FUNCTIONS ==============
 
-def run_git(args: List[str], cwd: Path = None) -> subprocess.CompletedProcess:
-    """Run a git command and return the result."""
-    cmd = ["git"] + args
+@functools.lru_cache(maxsize=None)
+def compile_template(template: str) -> tuple:
+    """Split a str.format template once into (UTF-8 literal, field_name) pieces."""
+    return tuple((literal.encode("utf-8"), field) for literal, field, _, _ in string.Formatter().parse(template))
+
+def render(template: str, **ctx: str) -> bytes:
+    """Fill a template from its cached, pre-encoded pieces; only the field values are encoded per call."""
+    return b"".join(
+        literal if field is None else literal + str(ctx[field]).encode("utf-8")
+        for literal, field in compile_template(template)
+    )
+
+def run_shell(script: str, cwd: Path = None) -> subprocess.CompletedProcess:
+    """Run a shell command line (e.g. several chained git commands) and return the result."""
     return subprocess.run(
-        cmd,
+        ["/bin/sh", "-c", script],
         cwd=str(cwd or WORKTREE_ROOT),
         text=True,
         capture_output=True,
@@ -228,6 +251,9 @@ class ScaffoldArgs(BaseModel):
             raise ValueError("skill_name cannot contain spaces or path separators")
         return v
 
+# Built once; list_tools hands out the same dict every time
+INPUT_SCHEMA = ScaffoldArgs.model_json_schema()
+
 # ============== TOOL DEFINITIONS ==============
 
 if MCP_AVAILABLE and server:
@@ -237,7 +263,7 @@ if MCP_AVAILABLE and server:
             Tool(
                 name="scaffold_skill",
                 description="Create a new MCP skill with standard directory structure, files, and git commit.",
-                inputSchema=ScaffoldArgs.model_json_schema(),
+                inputSchema=INPUT_SCHEMA,
             )
         ]
 
@@ -272,65 +298,77 @@ def do_scaffold_skill(skill_name: str, description: str, archon_project_id: str)
     # 2. Create Directories
     try:
         handoff_dir.mkdir(parents=True, exist_ok=True) # Changed to True
-        mcp_dir.mkdir(parents=True, exist_ok=True) # Changed to True
-        src_dir.mkdir(parents=True, exist_ok=True) # Changed to True
+        src_dir.mkdir(parents=True, exist_ok=True) # Also creates mcp_dir
         output.append("✅ Created/Verified directories")
     except Exception as e:
         return f"❌ Failed to create directories: {e}"
         
     # 3. Write Files
-    from datetime import date
     today = date.today().isoformat()
     
     files = {
         # Handoffs
-        handoff_dir / "feature_list.json": TEMPLATE_FEATURE_LIST.format(skill_name=skill_name, date=today),
-        handoff_dir / "progress.txt": TEMPLATE_PROGRESS.format(skill_name=skill_name, date=today),
-        handoff_dir / "RESUME.md": TEMPLATE_RESUME.format(skill_name=skill_name, archon_project_id=archon_project_id),
-        handoff_dir / "LESSONS_LEARNED.md": TEMPLATE_LESSONS.format(skill_name=skill_name),
+        handoff_dir / "feature_list.json": render(TEMPLATE_FEATURE_LIST, skill_name=skill_name, date=today),
+        handoff_dir / "progress.txt": render(TEMPLATE_PROGRESS, skill_name=skill_name, date=today),
+        handoff_dir / "RESUME.md": render(TEMPLATE_RESUME, skill_name=skill_name, archon_project_id=archon_project_id),
+        handoff_dir / "LESSONS_LEARNED.md": render(TEMPLATE_LESSONS, skill_name=skill_name),
         
         # MCPs
-        mcp_dir / "package.json": TEMPLATE_PACKAGE_JSON.format(skill_name=skill_name),
-        mcp_dir / "tsconfig.json": TEMPLATE_TSCONFIG,
-        mcp_dir / "README.md": TEMPLATE_README.format(skill_name=skill_name, description=description),
+        mcp_dir / "package.json": render(TEMPLATE_PACKAGE_JSON, skill_name=skill_name),
+        mcp_dir / "tsconfig.json": TSCONFIG_BYTES,
+        mcp_dir / "README.md": render(TEMPLATE_README, skill_name=skill_name, description=description),
         mcp_dir / "skill.json": json.dumps({
             "name": skill_name,
             "version": "0.1.0",
             "description": description,
             "tools": ["example_tool"]
-        }, indent=2),
-        src_dir / "index.ts": TEMPLATE_INDEX_TS.format(skill_name=skill_name),
+        }, indent=2).encode("utf-8"),
+        src_dir / "index.ts": render(TEMPLATE_INDEX_TS, skill_name=skill_name),
     }
     
+    # Check if exists to avoid overwriting handoffs blindly?
+    # Scaffolder usually assumes fresh start.
+    # But if running on existing handoffs, we might want to skip overwriting progress.
+    # One directory listing instead of a stat per file (handoff_dir was created above)
+    with os.scandir(handoff_dir) as entries:
+        existing_handoffs = {entry.name for entry in entries}
+    
+    to_write = {}
     for path, content in files.items():
-        # Check if exists to avoid overwriting handoffs blindly?
-        # Scaffolder usually assumes fresh start.
-        # But if running on existing handoffs, we might want to skip overwriting progress.
-        if path.exists() and "handoffs" in str(path):
+        if path.parent == handoff_dir and path.name in existing_handoffs:
              output.append(f"   Skipping existing handoff file: {path.name}")
              continue
-             
-        with open(path, "w") as f:
-            f.write(content)
-        output.append(f"   Created: {path.relative_to(WORKTREE_ROOT)}")
+        to_write[path] = content
+    
+    # Independent small files: issue the writes in parallel, as the raw bytes
+    # rendered above (no text-mode wrapper per file)
+    def write_one(item):
+        path, data = item
+        path.write_bytes(data)
+    
+    with ThreadPoolExecutor(max_workers=WRITE_WORKERS) as pool:
+        list(pool.map(write_one, to_write.items()))
+    root_prefix = len(str(WORKTREE_ROOT)) + 1  # every path here is under WORKTREE_ROOT
+    for path in to_write:
+        output.append(f"   Created: {str(path)[root_prefix:]}")
         
     output.append("✅ Written all template files")
     
     # 4. Git Integration
     output.append("\n=== GIT INTEGRATION ===")
     
-    # Add files
-    add_res = run_git(["add", str(handoff_dir), str(mcp_dir)])
-    if add_res.returncode != 0:
-        output.append(f"❌ Git add failed:\n{format_result(add_res)}")
+    # Add + commit in one shell; a failed add exits with GIT_ADD_FAILED so the
+    # two failure cases can still be told apart
+    commit_msg = f"feat: Scaffold {skill_name}\n\nGenerated by mcp-scaffolder."
+    add_cmd = shlex.join(["git", "add", str(handoff_dir), str(mcp_dir)])
+    commit_cmd = shlex.join(["git", "commit", "-m", commit_msg])
+    commit_res = run_shell(f"{add_cmd} || exit {GIT_ADD_FAILED}; {commit_cmd}")
+    if commit_res.returncode == GIT_ADD_FAILED:
+        output.append(f"❌ Git add failed:\n{format_result(commit_res)}")
         return "\n".join(output)
     
     output.append(f"Staged {skill_name} files...")
     
-    # Commit
-    commit_msg = f"feat: Scaffold {skill_name}\n\nGenerated by mcp-scaffolder."
-    commit_res = run_git(["commit", "-m", commit_msg])
-    
     if commit_res.returncode == 0:
         output.append(f"✅ Committed: {format_result(commit_res)}")
     else:
@@ -1,15 +1,32 @@
 #!/usr/bin/env python3
-import asyncio, json, sys, subprocess, os
+import asyncio, itertools, json, re, sys, subprocess, os
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Tuple
+import atexit
 import logging
+import logging.handlers
+import queue
 
-# Setup debug logging to file immediately
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Setup logging to file immediately. Records are queued and written by a
+# listener thread, so logging from the event loop never blocks on disk.
 log_path = Path(__file__).parent / 'hub_debug.log'
+LOG_LEVEL = os.environ.get("MEDIA_HUB_LOG_LEVEL", "INFO").upper()
+_log_queue = queue.SimpleQueue()
+_file_handler = logging.FileHandler(str(log_path))
+_file_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+_log_listener = logging.handlers.QueueListener(_log_queue, _file_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))  # final layout is the file handler's
 logging.basicConfig(
-    filename=str(log_path),
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    level=getattr(logging, LOG_LEVEL, logging.INFO),
+    handlers=[_queue_handler]
 )
 logging.info("----------------------------------------------------------------")
 logging.info(f"Starting MCP Hub. Python: {sys.executable}")
@@ -22,24 +39,59 @@ except ImportError as e:
     logging.critical(f"Failed to import mcp: {e}")
     logging.critical(f"sys.path: {sys.path}")
     sys.exit(1)
-logging.info(f"Starting MCP Hub. Python: {sys.executable}")
 logging.info(f"CWD: {os.getcwd()}")
 logging.info(f"Path: {sys.path}")
 
+# Per-skill startup progress on stderr only when debugging; failures are always reported
+VERBOSE = LOG_LEVEL == "DEBUG"
+
 ROOT = Path(__file__).parent
 SKILLS_DIR = ROOT / "skills"
 SERVER_NAME = "skills-hub"
+# Skills answer with one JSON-RPC line; full transcripts can be far past asyncio's 64KB default
+SKILL_STDOUT_LIMIT = 64 * 1024 * 1024
 
 server = Server(SERVER_NAME)
 
 PROCESSES: Dict[str, asyncio.subprocess.Process] = {}
 MANIFESTS: Dict[str, dict] = {}
 TOOL_MAPPING: Dict[str, str] = {} # tool_name -> skill_name
-SKILL_LOCKS: Dict[str, asyncio.Lock] = {}  # Lock per skill to prevent concurrent access
+CACHED_TOOLS: Dict[str, List[Tool]] = {}  # skill_name -> its tools, from the startup tools/list
+# In-flight requests per skill: JSON-RPC id -> future resolved by that skill's reader task
+PENDING: Dict[str, Dict[int, asyncio.Future]] = {}
+READERS: Dict[str, asyncio.Task] = {}
+REQUEST_IDS = itertools.count()
+
+# Hub-level tools that are a single call to a skill tool with some arguments pinned.
+# tiktok_to_mp3 has yt-dlp extract MP3 in one pass, instead of tiktok_download
+# writing an MP4 that mp4_to_mp3 then decodes and re-encodes.
+FUSED_TOOLS = {
+    "tiktok_to_mp3": {
+        "target": "tiktok_download-ok",  # tool name comes from the skill's manifest
+        "arguments": {"format": "mp3"},
+        "description": "Download a TikTok video's audio straight to MP3 (single yt-dlp pass). "
+                       "Prefer this over tiktok_download + mp4_to_mp3 when only audio is needed.",
+    },
+}
 
 # Event to signal that skills are ready
 STARTUP_EVENT = asyncio.Event()
 
+# Cap simultaneous skill spawns (each holds 3 pipes) to stay clear of EMFILE
+SPAWN_CONCURRENCY = 16
+SPAWN_SEM = asyncio.Semaphore(SPAWN_CONCURRENCY)
+
+# JSON-RPC framing for skill pipes; orjson works on bytes directly when available
+if orjson is not None:
+    def encode_message(msg: dict) -> bytes:
+        return orjson.dumps(msg) + b"\n"
+    decode_message = orjson.loads
+else:
+    def encode_message(msg: dict) -> bytes:
+        return (json.dumps(msg) + "\n").encode('utf-8')
+    def decode_message(line: bytes):
+        return json.loads(line.decode('utf-8'))
+
 async def load_skills_and_initialize():
     """Background task to load and initialize skills"""
     print(f"Loading skills from {SKILLS_DIR}...", file=sys.stderr)
@@ -48,34 +100,35 @@ async def load_skills_and_initialize():
         STARTUP_EVENT.set()
         return
 
-    # 1. Spawn Processes
-    spawn_tasks = []
-    for skill_dir in SKILLS_DIR.iterdir():
-        manifest_path = skill_dir / "skill.json"
-        if not manifest_path.exists():
-            continue
-        spawn_tasks.append(spawn_skill(skill_dir, manifest_path))
-    
-    await asyncio.gather(*spawn_tasks)
-    
-    # 2. Initialize Handshakes
-    print("Initializing skills...", file=sys.stderr)
-    init_tasks = []
-    for name, proc in PROCESSES.items():
-        init_tasks.append(initialize_skill_process(name, proc))
-    
-    await asyncio.gather(*init_tasks)
+    # Each skill is spawned, initialized and listed as one chain, so startup
+    # takes as long as the slowest skill rather than the sum of the phases
+    results = await asyncio.gather(*(
+        bring_up_skill(skill_dir, skill_dir / "skill.json")
+        for skill_dir in SKILLS_DIR.iterdir()
+        if (skill_dir / "skill.json").exists()
+    ))
     
-    # 3. Build Tool Mapping (Initial Scan)
-    print("Building tool mapping...", file=sys.stderr)
-    await populate_tool_mapping()
+    # Register in directory order so duplicate tool names resolve the same way every run
+    if VERBOSE:
+        print("Building tool mapping...", file=sys.stderr)
+    register_tools([r for r in results if r is not None])
     
     print("Hub startup complete! Skills ready.", file=sys.stderr)
     STARTUP_EVENT.set()
 
+async def bring_up_skill(skill_dir: Path, manifest_path: Path):
+    """Spawn, handshake and list one skill; returns (name, tools) or None if it failed to start"""
+    name = await spawn_skill(skill_dir, manifest_path)
+    if name is None:
+        return None
+    await initialize_skill_process(name, PROCESSES[name])
+    return name, await list_skill_tools(name)
+
 async def spawn_skill(skill_dir: Path, manifest_path: Path):
     try:
-        manifest = json.loads(manifest_path.read_text())
+        # Read off the event loop so manifest I/O overlaps the other spawns
+        loop = asyncio.get_running_loop()
+        manifest = json.loads(await loop.run_in_executor(None, manifest_path.read_text))
         name = manifest["name"]
         cmd = manifest["command"]
         
@@ -83,136 +136,201 @@ async def spawn_skill(skill_dir: Path, manifest_path: Path):
         if cmd[0] == "python3":
             cmd[0] = sys.executable
         
-        print(f"Starting skill: {name}", file=sys.stderr)
+        if VERBOSE:
+            print(f"Starting skill: {name}", file=sys.stderr)
 
         env = os.environ.copy()
         env["MCP_SKILL_NAME"] = name
 
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            cwd=skill_dir,
-            env=env,
-            stdin=asyncio.subprocess.PIPE,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=sys.stderr, # Forward stderr
-        )
+        async with SPAWN_SEM:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                cwd=skill_dir,
+                env=env,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=sys.stderr, # Forward stderr
+                limit=SKILL_STDOUT_LIMIT,
+            )
 
         PROCESSES[name] = process
         MANIFESTS[name] = manifest
-        SKILL_LOCKS[name] = asyncio.Lock()  # Create lock for this skill
+        PENDING[name] = {}
+        READERS[name] = asyncio.create_task(_read_responses(name, process))
+        return name
     except Exception as e:
         print(f"Failed to load skill {skill_dir.name}: {e}", file=sys.stderr)
+        return None
 
-async def initialize_skill_process(name: str, proc: asyncio.subprocess.Process):
-    """Perform MCP handshake with a skill process"""
-    lock = SKILL_LOCKS.get(name)
-    if not lock:
-        return False
-    
-    async with lock:
+# Responses lead with their id ({"jsonrpc":"2.0","id":N,...}), so an oversized
+# line can still be pinned to one request from its first bytes
+_RESPONSE_ID = re.compile(rb'\s*\{\s*(?:"jsonrpc"\s*:\s*"2\.0"\s*,\s*)?"id"\s*:\s*(\d+)\s*,')
+
+async def _skip_oversized_line(stream: asyncio.StreamReader, consumed: int) -> bytes:
+    """Drop a line that overran the stream limit and return its first bytes."""
+    head = await stream.read(consumed)
+    while True:
         try:
-            # 1. Initialize
-            init_req = {
-                "jsonrpc": "2.0",
-                "method": "initialize",
-                "params": {
-                    "protocolVersion": "2024-11-05", # Updated protocol version
-                    "capabilities": {},
-                    "clientInfo": {"name": "skills-hub", "version": "1.0"}
-                },
-                "id": 0
-            }
-            proc.stdin.write((json.dumps(init_req) + "\n").encode('utf-8'))
-            await proc.stdin.drain()
-            
-            # 2. Await response
-            line = await proc.stdout.readline()
+            await stream.readuntil(b"\n")
+            return head
+        except asyncio.LimitOverrunError as e:
+            await stream.read(e.consumed)
+        except asyncio.IncompleteReadError:
+            return head
+
+async def _read_responses(name: str, proc: asyncio.subprocess.Process):
+    """Route each JSON-RPC response from a skill to the future waiting on its id."""
+    pending = PENDING[name]
+    try:
+        while True:
+            try:
+                line = await proc.stdout.readuntil(b"\n")
+            except asyncio.IncompleteReadError as e:
+                line = e.partial  # EOF; a last unterminated line is still a response
+            except asyncio.LimitOverrunError as e:
+                head = await _skip_oversized_line(proc.stdout, e.consumed)
+                error = ValueError(f"Response from skill {name} exceeded {SKILL_STDOUT_LIMIT} bytes")
+                print(f"Oversized response from skill {name}: {head[:200]!r}", file=sys.stderr)
+                match = _RESPONSE_ID.match(head)
+                if match:
+                    targets = [pending.get(int(match.group(1)))]
+                else:
+                    # No id up front: there is no telling whose it was, so every
+                    # call in flight on this skill fails rather than hang
+                    targets = list(pending.values())
+                for fut in targets:
+                    if fut is not None and not fut.done():
+                        fut.set_exception(error)
+                continue
             if not line:
-                print(f"Skill {name} failed to respond to initialize", file=sys.stderr)
-                return False
-                
-            resp = json.loads(line.decode('utf-8'))
-            if "error" in resp:
-                print(f"Skill {name} initialization error: {resp['error']}", file=sys.stderr)
-                return False
-                
-            # 3. Send initialized notification
-            proc.stdin.write((json.dumps({
-                "jsonrpc": "2.0",
-                "method": "notifications/initialized",
-                "params": {}
-            }) + "\n").encode('utf-8'))
-            await proc.stdin.drain()
+                break
+            try:
+                msg = decode_message(line)
+            except ValueError:
+                print(f"Skill {name} wrote a non-JSON line: {line[:200]!r}", file=sys.stderr)
+                continue
+            if not isinstance(msg, dict):
+                print(f"Skill {name} wrote a non-object JSON line: {line[:200]!r}", file=sys.stderr)
+                continue
+            # Skip notifications / server-initiated requests; only responses carry our ids
+            if "method" in msg:
+                continue
+            fut = pending.get(msg.get("id"))
+            if fut is not None and not fut.done():
+                fut.set_result(msg)
+    finally:
+        # Skill is gone: stop advertising its tools and fail whatever was waiting
+        CACHED_TOOLS.pop(name, None)
+        for fut in pending.values():
+            if not fut.done():
+                fut.set_exception(ConnectionError(f"Skill {name} closed its output"))
+
+async def send_request(name: str, method: str, params: dict = None) -> dict:
+    """Send one JSON-RPC request to a skill and await its response.
+    
+    Requests are matched to responses by id, so any number can be in flight
+    per skill at once.
+    """
+    proc = PROCESSES[name]
+    if READERS[name].done():
+        # Nobody would ever resolve the future
+        raise ConnectionError(f"Skill {name} closed its output")
+    req_id = next(REQUEST_IDS)
+    request = {"jsonrpc": "2.0", "method": method, "id": req_id}
+    if params is not None:
+        request["params"] = params
+    fut = asyncio.get_running_loop().create_future()
+    PENDING[name][req_id] = fut
+    try:
+        proc.stdin.write(encode_message(request))
+        await proc.stdin.drain()
+        return await fut
+    finally:
+        PENDING[name].pop(req_id, None)
+
+async def send_notification(name: str, method: str, params: dict):
+    proc = PROCESSES[name]
+    proc.stdin.write(encode_message({
+        "jsonrpc": "2.0",
+        "method": method,
+        "params": params
+    }))
+    await proc.stdin.drain()
+
+async def initialize_skill_process(name: str, proc: asyncio.subprocess.Process):
+    """Perform MCP handshake with a skill process"""
+    try:
+        # 1. Initialize
+        resp = await send_request(name, "initialize", {
+            "protocolVersion": "2024-11-05", # Updated protocol version
+            "capabilities": {},
+            "clientInfo": {"name": "skills-hub", "version": "1.0"}
+        })
+        if "error" in resp:
+            print(f"Skill {name} initialization error: {resp['error']}", file=sys.stderr)
+            return False
             
+        # 2. Send initialized notification
+        await send_notification(name, "notifications/initialized", {})
+        
+        if VERBOSE:
             print(f"Skill {name} initialized successfully", file=sys.stderr)
-            return True
-        except Exception as e:
-            print(f"Error initializing skill {name}: {e}", file=sys.stderr)
-            return False
+        return True
+    except ConnectionError:
+        print(f"Skill {name} failed to respond to initialize", file=sys.stderr)
+        return False
+    except Exception as e:
+        print(f"Error initializing skill {name}: {e}", file=sys.stderr)
+        return False
 
-async def populate_tool_mapping():
-    """Populate TOOL_MAPPING by listing tools from all skills"""
+async def list_skill_tools(name: str) -> List[Tool]:
+    """Fetch a skill's tools/list ([] if it is dead or the call fails)"""
+    try:
+        if PROCESSES[name].returncode is not None:
+            print(f"Skill {name} is dead. Restarting logic needed.", file=sys.stderr)
+            return []
+        response = await send_request(name, "tools/list")
+        if "result" in response:
+            return [Tool(**t) for t in response["result"].get("tools", [])]
+    except Exception as e:
+        print(f"Error listing tools for {name}: {e}", file=sys.stderr)
+    return []
+
+def register_tools(skill_tools: List[Tuple[str, List[Tool]]]):
+    """Populate TOOL_MAPPING and CACHED_TOOLS from each skill's tools/list"""
     TOOL_MAPPING.clear()
-    for name, proc in list(PROCESSES.items()):
-        lock = SKILL_LOCKS.get(name)
-        if not lock:
+    CACHED_TOOLS.clear()
+    for name, tools in skill_tools:
+        # A skill that exited meanwhile has already been dropped by its reader
+        if READERS[name].done():
             continue
-        async with lock:
-            try:
-                request = {"jsonrpc": "2.0", "method": "tools/list", "id": 1}
-                proc.stdin.write((json.dumps(request) + "\n").encode('utf-8'))
-                await proc.stdin.drain()
-                
-                line = await proc.stdout.readline()
-                if line:
-                    response = json.loads(line.decode('utf-8'))
-                    if "result" in response:
-                        skill_tools = response["result"].get("tools", [])
-                        for t in skill_tools:
-                            tool_obj = Tool(**t)
-                            TOOL_MAPPING[tool_obj.name] = name
-            except Exception as e:
-                    print(f"Error listing tools for {name}: {e}", file=sys.stderr)
+        CACHED_TOOLS[name] = tools
+        for tool_obj in tools:
+            TOOL_MAPPING[tool_obj.name] = name
+    add_fused_tools()
+
+def add_fused_tools():
+    """Advertise FUSED_TOOLS whose target tool is available"""
+    for fused_name, spec in FUSED_TOOLS.items():
+        skill_name = TOOL_MAPPING.get(spec["target"])
+        if not skill_name:
+            continue
+        target = next(t for t in CACHED_TOOLS[skill_name] if t.name == spec["target"])
+        schema = dict(target.inputSchema)
+        schema["properties"] = {k: v for k, v in schema.get("properties", {}).items() if k not in spec["arguments"]}
+        if "required" in schema:
+            schema["required"] = [k for k in schema["required"] if k not in spec["arguments"]]
+        # Filed under the target's skill so it disappears if that skill exits
+        TOOL_MAPPING[fused_name] = skill_name
+        CACHED_TOOLS[skill_name].append(Tool(name=fused_name, description=spec["description"], inputSchema=schema))
 
 async def proxy_list_tools():
     # Wait for startup to complete
     await STARTUP_EVENT.wait()
     
-    tools = []
-    # Using list() to iterate copy safe
-    for name, proc in list(PROCESSES.items()):
-        lock = SKILL_LOCKS.get(name)
-        if not lock:
-            continue
-        async with lock:
-            try:
-                request = {
-                    "jsonrpc": "2.0",
-                    "method": "tools/list",
-                    "id": 1
-                }
-                if proc.returncode is not None:
-                    print(f"Skill {name} is dead. Restarting logic needed.", file=sys.stderr)
-                    continue
-
-                proc.stdin.write((json.dumps(request) + "\n").encode('utf-8'))
-                await proc.stdin.drain()
-                
-                line = await proc.stdout.readline()
-                if not line:
-                    continue
-                    
-                response = json.loads(line.decode('utf-8'))
-                if "error" in response:
-                    continue
-                    
-                for t in response.get("result", {}).get("tools", []):
-                    tools.append(Tool(**t))
-                    
-            except Exception as e:
-                print(f"Error communicating with skill {name}: {e}", file=sys.stderr)
-            
-    return tools
+    # Tool lists are fixed per skill process; serve the startup snapshot
+    # (skills that exited are dropped from it by their reader task)
+    return [tool for tools in CACHED_TOOLS.values() for tool in tools]
 
 
 @server.list_tools()
@@ -228,35 +346,23 @@ async def call_tool(name: str, arguments: dict):
     if not skill_name:
         skill_name = name
         
-    proc = PROCESSES.get(skill_name)
-    lock = SKILL_LOCKS.get(skill_name)
-    
-    if not proc or not lock:
+    if skill_name not in PROCESSES:
         return [TextContent(type="text", text=f"Unknown tool: {name}")]
 
-    request = {
-        "jsonrpc": "2.0",
-        "method": "tools/call",
-        "params": {"name": name, "arguments": arguments},
-        "id": 1
-    }
+    fused = FUSED_TOOLS.get(name)
+    if fused:
+        name, arguments = fused["target"], {**(arguments or {}), **fused["arguments"]}
 
-    async with lock:
-        try:
-            proc.stdin.write((json.dumps(request) + "\n").encode('utf-8'))
-            await proc.stdin.drain()
-
-            line = await proc.stdout.readline()
-            if not line:
-                 return [TextContent(type="text", text="Error: Empty response from skill")]
-                 
-            response = json.loads(line.decode('utf-8'))
-            if "error" in response:
-                return [TextContent(type="text", text=f"Error from skill: {response['error']}")]
-                
-            return response.get("result", {}).get("content", [])
-        except Exception as e:
-            return [TextContent(type="text", text=f"Error communicating with skill: {str(e)}")]
+    try:
+        response = await send_request(skill_name, "tools/call", {"name": name, "arguments": arguments})
+        if "error" in response:
+            return [TextContent(type="text", text=f"Error from skill: {response['error']}")]
+            
+        return response.get("result", {}).get("content", [])
+    except ConnectionError:
+        return [TextContent(type="text", text="Error: Empty response from skill")]
+    except Exception as e:
+        return [TextContent(type="text", text=f"Error communicating with skill: {str(e)}")]
 
 
 async def main():
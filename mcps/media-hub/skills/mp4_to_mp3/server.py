@@ -1,8 +1,12 @@
 #!/usr/bin/env python3
 import asyncio
+import functools
+import json
 import subprocess
 import os
 import shutil
+import tempfile
+import time
 from pathlib import Path
 from typing import Optional
 from mcp.server import Server
@@ -10,7 +14,28 @@ from mcp.types import Tool, TextContent
 from pydantic import BaseModel, Field
 
 # Configuration
-FFMPEG = shutil.which("ffmpeg") or "/opt/homebrew/bin/ffmpeg"
+@functools.cache
+def ffmpeg_path() -> str:
+    """Resolved on first use: PATH first, then the Homebrew default"""
+    return shutil.which("ffmpeg") or "/opt/homebrew/bin/ffmpeg"
+
+@functools.cache
+def ffprobe_path() -> str:
+    """Resolved on first use: PATH first, then the Homebrew default"""
+    return shutil.which("ffprobe") or "/opt/homebrew/bin/ffprobe"
+
+# Binary presence is checked once per process rather than stat'ed on every request
+@functools.cache
+def has_ffmpeg() -> bool:
+    return os.path.exists(ffmpeg_path())
+
+@functools.cache
+def has_ffprobe() -> bool:
+    return os.path.exists(ffprobe_path())
+
+FFMPEG_TIMEOUT = 300
+STDERR_TAIL = 500  # only the end of ffmpeg's log is reported
+MIN_SEGMENT_SECONDS = 60  # shorter inputs aren't worth splitting
 
 # Get tool name from environment (injected by Hub) or fallback
 TOOL_NAME = os.environ.get("MCP_SKILL_NAME", "mp4_to_mp3")
@@ -21,13 +46,19 @@ class Mp4ToMp3Args(BaseModel):
     input_file: str = Field(description="Path to input MP4 file")
     output_file: Optional[str] = Field(default=None, description="Output MP3 path (default: same name as input)")
     quality: int = Field(default=2, description="Audio quality 0-9 (lower = better, default: 2)")
+    workers: int = Field(default=1, description="Max parallel ffmpeg encoders for inputs of 2+ minutes (default 1 = single pass). "
+                         "Slices are joined without re-encoding, so each boundary may carry a short gap or click")
+    force_mp3: bool = Field(default=False, description="Always encode MP3. By default AAC audio is copied into an .m4a without re-encoding (unless output_file ends in .mp3)")
+
+# Built once; list_tools hands out the same dict every time
+INPUT_SCHEMA = Mp4ToMp3Args.model_json_schema()
 
 @server.list_tools()
 async def list_tools():
     return [Tool(
         name=TOOL_NAME,
-        description="Convert MP4 video file to MP3 audio using ffmpeg.",
-        inputSchema=Mp4ToMp3Args.model_json_schema()
+        description="Convert MP4 video file to MP3 audio using ffmpeg. AAC audio is extracted to .m4a as-is unless force_mp3 is set.",
+        inputSchema=INPUT_SCHEMA
     )]
 
 @server.call_tool()
@@ -37,37 +68,52 @@ async def call_tool(name: str, arguments: dict):
     
     try:
         args = Mp4ToMp3Args(**arguments)
-        result = do_mp4_to_mp3(args)
+        result = await do_mp4_to_mp3(args)
         return [TextContent(type="text", text=result)]
     except Exception as e:
         return [TextContent(type="text", text=f"Error: {e}")]
 
-def do_mp4_to_mp3(args: Mp4ToMp3Args) -> str:
+async def do_mp4_to_mp3(args: Mp4ToMp3Args) -> str:
     """Convert MP4 to MP3"""
-    if not os.path.exists(FFMPEG):
-        return f"ERROR: ffmpeg not found at {FFMPEG}. Install with: brew install ffmpeg"
+    if not has_ffmpeg():
+        return f"ERROR: ffmpeg not found at {ffmpeg_path()}. Install with: brew install ffmpeg"
     
     if not os.path.exists(args.input_file):
         return f"ERROR: Input file not found: {args.input_file}"
     
-    output_file = args.output_file or args.input_file.rsplit(".", 1)[0] + ".mp3"
+    probe = await probe_audio(args.input_file)
+    wants_mp3 = args.force_mp3 or (args.output_file or "").lower().endswith(".mp3")
+    copy_audio = not wants_mp3 and probe.get("codec") == "aac"
+    segments = 1
     
-    # -vn: disable video recording
-    # -acodec libmp3lame: force mp3 encoding
-    # -q:a: variable bit rate quality
-    # -y: overwrite output files
-    cmd = [FFMPEG, "-i", args.input_file, "-vn", "-acodec", "libmp3lame", "-q:a", str(args.quality), "-y", output_file]
-    
-    import time
-    from datetime import datetime
+    if copy_audio:
+        # AAC source: remux the existing stream, no decode/encode
+        stem = args.input_file.rsplit(".", 1)[0]
+        # An .m4a input would otherwise be its own output (ffmpeg refuses that)
+        default_output = stem + (".audio.m4a" if args.input_file.lower().endswith(".m4a") else ".m4a")
+        output_file = args.output_file or default_output
+        cmd = [ffmpeg_path(), "-i", args.input_file, "-vn", "-c:a", "copy", "-y", output_file]
+    else:
+        output_file = args.output_file or args.input_file.rsplit(".", 1)[0] + ".mp3"
+        # -vn: disable video recording
+        # -acodec libmp3lame: force mp3 encoding
+        # -q:a: variable bit rate quality
+        # -y: overwrite output files
+        cmd = [ffmpeg_path(), "-i", args.input_file, "-vn", "-acodec", "libmp3lame", "-q:a", str(args.quality), "-y", output_file]
+        # libmp3lame uses one core per stream; long inputs are encoded as parallel segments
+        segments = min(args.workers, int(probe.get("duration", 0) // MIN_SEGMENT_SECONDS))
     
     start_time = time.time()
-    start_dt = datetime.fromtimestamp(start_time).strftime('%Y-%m-%d %H:%M:%S')
+    start_dt = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(start_time))
     
-    result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+    if segments > 1:
+        returncode, tail = await encode_segments(args, probe["duration"], segments, output_file)
+    else:
+        returncode, tail = await run_ffmpeg(cmd)
+    stderr = tail.decode("utf-8", errors="replace")
     
     end_time = time.time()
-    end_dt = datetime.fromtimestamp(end_time).strftime('%Y-%m-%d %H:%M:%S')
+    end_dt = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(end_time))
     duration = end_time - start_time
     
     # Format duration nicely
@@ -80,14 +126,106 @@ def do_mp4_to_mp3(args: Mp4ToMp3Args) -> str:
     output = f"=== MP4 to MP3 ===\n"
     output += f"Input: {args.input_file}\n"
     output += f"Output: {output_file}\n"
+    if copy_audio: output += "Audio: AAC copied (not re-encoded)\n"
+    if segments > 1: output += f"Segments: {segments} (encoded in parallel)\n"
     output += f"Start Time: {start_dt}\n"
     output += f"End Time:   {end_dt}\n"
     output += f"Elapsed:    {duration_str}\n\n"
     
-    if result.stderr: output += result.stderr[-500:] + "\n"  # ffmpeg outputs to stderr
-    output += "✅ Success!" if result.returncode == 0 else f"❌ Failed (code {result.returncode})"
+    if stderr: output += stderr + "\n"  # ffmpeg outputs to stderr
+    output += "✅ Success!" if returncode == 0 else f"❌ Failed (code {returncode})"
     return output
 
+async def encode_segments(args: Mp4ToMp3Args, duration: float, segments: int, output_file: str):
+    """Encode equal time slices of the input concurrently, then join them without re-encoding.
+    
+    Each slice is its own LAME stream (encoder delay, padding, info frame) and
+    concat copies them as they are, so slice boundaries are not gapless.
+    """
+    chunk = duration / segments
+    with tempfile.TemporaryDirectory(prefix="mp4_to_mp3_") as tmp:
+        parts = [os.path.join(tmp, f"part_{i}.mp3") for i in range(segments)]
+        tasks = [asyncio.ensure_future(run_ffmpeg(
+            [ffmpeg_path(), "-ss", str(i * chunk)] + (["-t", str(chunk)] if i < segments - 1 else [])
+            + ["-i", args.input_file, "-vn", "-acodec", "libmp3lame", "-q:a", str(args.quality), "-y", part]
+        )) for i, part in enumerate(parts)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                returncode, tail = await next_done
+                if returncode != 0:
+                    return returncode, tail
+        finally:
+            # One slice failed or timed out: kill the other encoders before tmp is removed
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        list_file = os.path.join(tmp, "list.txt")
+        with open(list_file, "w") as f:
+            f.writelines(f"file '{part}'\n" for part in parts)
+        return await run_ffmpeg([ffmpeg_path(), "-f", "concat", "-safe", "0", "-i", list_file, "-c", "copy", "-y", output_file])
+
+async def run_ffmpeg(cmd: list):
+    """Run ffmpeg; returns (returncode, last STDERR_TAIL bytes of its log)"""
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        tail = await asyncio.wait_for(read_tail(proc.stderr), FFMPEG_TIMEOUT)
+        return await proc.wait(), tail
+    except asyncio.TimeoutError:
+        raise subprocess.TimeoutExpired(cmd, FFMPEG_TIMEOUT)
+    finally:
+        # Timed out or cancelled: don't leave ffmpeg running
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+
+async def probe_audio(path: str) -> dict:
+    """Codec of the first audio stream and the container duration ({} if they can't be probed)"""
+    if not has_ffprobe():
+        return {}
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            ffprobe_path(), "-v", "error", "-select_streams", "a:0",
+            "-show_entries", "stream=codec_name:format=duration", "-of", "json", path,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        stdout, _ = await asyncio.wait_for(proc.communicate(), 30)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        return {}
+    except Exception:
+        return {}
+    if proc.returncode != 0:
+        return {}
+    try:
+        data = json.loads(stdout)
+        streams = data.get("streams") or [{}]
+        probe = {"codec": streams[0].get("codec_name")}
+        if "duration" in data.get("format", {}):
+            probe["duration"] = float(data["format"]["duration"])
+        return probe
+    except (ValueError, TypeError):
+        return {}
+
+async def read_tail(stream: asyncio.StreamReader) -> bytes:
+    """Drain a stream, keeping only its last STDERR_TAIL bytes.
+
+    Reads in chunks rather than lines: ffmpeg's progress updates are
+    separated by carriage returns, so one "line" can grow without bound.
+    """
+    tail = b""
+    while chunk := await stream.read(4096):
+        tail = (tail + chunk)[-STDERR_TAIL:]
+    return tail
+
 async def main():
     from mcp.server.stdio import stdio_server
     async with stdio_server() as (r, w):
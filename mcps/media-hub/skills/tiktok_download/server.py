@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import asyncio
+import functools
 import subprocess
 import os
 import shutil
@@ -11,7 +12,16 @@ from pydantic import BaseModel, Field
 
 # Configuration
 DEFAULT_OUTPUT = Path.home() / "Documents" / "transcriptions"
-YT_DLP = shutil.which("yt-dlp") or "/opt/homebrew/bin/yt-dlp"
+@functools.cache
+def yt_dlp_path() -> str:
+    """Resolved on first use: PATH first, then the Homebrew default"""
+    return shutil.which("yt-dlp") or "/opt/homebrew/bin/yt-dlp"
+
+@functools.cache
+def has_yt_dlp() -> bool:
+    """Checked once per process rather than stat'ed on every request"""
+    return os.path.exists(yt_dlp_path())
+
 
 # Get tool name from environment (injected by Hub) or fallback
 TOOL_NAME = os.environ.get("MCP_SKILL_NAME", "tiktok_download")
@@ -23,12 +33,15 @@ class TikTokDownloadArgs(BaseModel):
     format: Literal["mp4", "mp3"] = Field(default="mp4", description="Output format: mp4 (video) or mp3 (audio only)")
     output_dir: str = Field(default=str(DEFAULT_OUTPUT), description="Output directory")
 
+# Built once; list_tools hands out the same dict every time
+INPUT_SCHEMA = TikTokDownloadArgs.model_json_schema()
+
 @server.list_tools()
 async def list_tools():
     return [Tool(
         name=TOOL_NAME,
         description="Download TikTok video as MP4 or extract audio as MP3.",
-        inputSchema=TikTokDownloadArgs.model_json_schema()
+        inputSchema=INPUT_SCHEMA
     )]
 
 @server.call_tool()
@@ -45,11 +58,11 @@ async def call_tool(name: str, arguments: dict):
 
 def do_tiktok_download(args: TikTokDownloadArgs) -> str:
     """Download TikTok video/audio"""
-    if not os.path.exists(YT_DLP):
-        return f"ERROR: yt-dlp not found at {YT_DLP}. Install with: brew install yt-dlp"
+    if not has_yt_dlp():
+        return f"ERROR: yt-dlp not found at {yt_dlp_path()}. Install with: brew install yt-dlp"
     
     os.makedirs(args.output_dir, exist_ok=True)
-    cmd = [YT_DLP, "--no-playlist"]
+    cmd = [yt_dlp_path(), "--no-playlist"]
     
     if args.format == "mp3":
         cmd.extend(["-x", "--audio-format", "mp3"])
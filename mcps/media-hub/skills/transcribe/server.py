@@ -2,13 +2,21 @@
 """
 TRANSCRIBE - Audio/Video to Text Transcription Skill
 
-Converts audio/video files to text with timestamps using OpenAI Whisper (local, free).
+Converts audio/video files to text with timestamps using Whisper (local, free).
+Runs in-process on faster-whisper (CTranslate2, int8) when it is installed and
+falls back to the OpenAI Whisper CLI otherwise.
 
 SUPPORTED FORMATS: MP3, MP4, WAV, M4A, FLAC, OGG, WEBM, AAC, WMA
 
+MODEL ALIASES:
+  - fast:     distil-small.en (default; falls back to small for non-English)
+  - accurate: distil-large-v3 (falls back to large-v3-turbo for non-English)
+  - turbo:    large-v3-turbo
+  Any other name (tiny, base, small, ...) is passed through unchanged.
+
 MODELS & SPEED (on Mac M1/M2):
   - tiny:   ~10x realtime  (27 min file → ~3 min)   - Good for speech, fastest
-  - base:   ~1.5x realtime (27 min file → ~17 min)  - Better accuracy (default)
+  - base:   ~1.5x realtime (27 min file → ~17 min)  - Better accuracy
   - small:  ~0.5x realtime (27 min file → ~50 min)  - Even better accuracy
   - medium: ~0.2x realtime (27 min file → ~2 hours) - High accuracy
   - large:  ~0.1x realtime (27 min file → ~4 hours) - Highest accuracy
@@ -21,31 +29,73 @@ OUTPUT FORMATS:
 
 TIMESTAMP GRANULARITY:
   - Default SRT/VTT: ~20-30 second segments (fast)
-  - words_per_segment=10: ~3-5 second segments (10x slower, only for files <10 min)
+  - words_per_segment=10: ~3-5 second segments (word timestamps, any length; faster-whisper only)
 
 AUTO-COMPRESSION:
-  Files >10MB or >5 min are automatically compressed to 32kbps mono for faster processing.
+  Files >10MB or >5 min are decoded by ffmpeg to 16kHz mono PCM (Whisper's native rate) and streamed to the model
+  (skipped when the audio is already low-bitrate mono mp3/opus/aac).
+
+BATCHED INFERENCE:
+  Audio is split on speech (Silero VAD) and the chunks go through the encoder in batches
+  of BATCH_SIZE; silence is skipped.
 
 EXAMPLES:
-  Quick transcription:     {file: "video.mp4", model: "tiny", output_format: "txt"}
+  Quick transcription:     {file: "video.mp4", model: "fast", output_format: "txt"}
   With timestamps:         {file: "audio.mp3", output_format: "srt"}
-  Short segments (<10min): {file: "short.mp3", output_format: "srt", words_per_segment: 10}
+  Short segments:          {file: "short.mp3", output_format: "srt", words_per_segment: 10}
   Hebrew transcription:    {file: "hebrew.mp3", language: "he", output_format: "srt"}
 """
 import asyncio
+import functools
+import json
+import logging
+import logging.handlers
 import subprocess
 import os
 import sys
 import shutil
+import struct
+import tempfile
+import threading
+import time
+from itertools import islice
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 from mcp.server import Server
 from mcp.types import Tool, TextContent
 from pydantic import BaseModel, Field
 
+try:
+    import ctranslate2
+    import numpy as np
+    from faster_whisper import BatchedInferencePipeline, WhisperModel
+except ImportError:
+    WhisperModel = None  # fall back to the whisper CLI
+
 # Configuration
-WHISPER = shutil.which("whisper") or "/opt/homebrew/bin/whisper"
-FFMPEG = shutil.which("ffmpeg") or "/opt/homebrew/bin/ffmpeg"
+def _resolve(name: str, fallback: str) -> str:
+    """Locate a binary once at import: PATH first, then the Homebrew default"""
+    return shutil.which(name) or fallback
+
+WHISPER = _resolve("whisper", "/opt/homebrew/bin/whisper")
+FFMPEG = _resolve("ffmpeg", "/opt/homebrew/bin/ffmpeg")
+FFPROBE = _resolve("ffprobe", "/opt/homebrew/bin/ffprobe")
+_HAS_WHISPER = os.path.exists(WHISPER)
+_HAS_FFMPEG = os.path.exists(FFMPEG)
+_HAS_FFPROBE = os.path.exists(FFPROBE)
+
+# Debug log: one shared rotating file (opened on first write) plus stderr
+logger = logging.getLogger("transcribe")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+_file_handler = logging.handlers.RotatingFileHandler(
+    "/tmp/transcribe.log", maxBytes=1_000_000, backupCount=2, delay=True)
+_file_handler.setFormatter(logging.Formatter("%(asctime)s - %(message)s"))
+logger.addHandler(_file_handler)
+logger.addHandler(logging.StreamHandler(sys.stderr))
+
+if WhisperModel is None and not _HAS_WHISPER:
+    logger.warning(f"No transcription backend: faster-whisper is not installed and whisper not found at {WHISPER}")
 
 # Get tool name from environment (injected by Hub) or fallback
 TOOL_NAME = os.environ.get("MCP_SKILL_NAME", "transcribe")
@@ -53,16 +103,16 @@ server = Server(TOOL_NAME)
 
 TOOL_DESCRIPTION = """Transcribe audio/video to text with timestamps.
 
-MODELS (speed on Mac):
-- tiny: ~10x realtime (fastest, good for speech)
-- base: ~1.5x realtime (default, better accuracy)  
-- small/medium/large: slower but more accurate
+MODELS:
+- fast (default): distil-small.en, distilled and quick (greedy decoding)
+- accurate: distil-large-v3 / turbo: large-v3-turbo
+- tiny/base/small/medium/large: reference checkpoints
 
 FORMATS: MP3, MP4, WAV, M4A, FLAC, OGG, WEBM
 OUTPUT: txt (no timestamps), srt/vtt (with timestamps), json (full data)
 
 For SRT timestamps: ~20-30 sec segments by default.
-For ~3 sec segments: use words_per_segment=10 (only for files <10 min, 10x slower).
+For ~3 sec segments: use words_per_segment=10.
 
 Files >10MB or >5min are auto-compressed for speed."""
 
@@ -71,16 +121,20 @@ class TranscribeArgs(BaseModel):
     file: str = Field(description="Path to audio/video file (MP3, MP4, WAV, M4A, FLAC, OGG, WEBM, etc.)")
     output_dir: Optional[str] = Field(default=None, description="Output directory (default: same as input)")
     language: str = Field(default="en", description="Language code: en, he, es, fr, de, ja, zh, etc.")
-    model: str = Field(default="base", description="Whisper model: tiny (~10x speed), base (default, ~1.5x), small, medium, large (most accurate)")
+    model: str = Field(default="fast", description="Whisper model: fast (default, distil-small.en), accurate (distil-large-v3), turbo (large-v3-turbo), or tiny, base, small, medium, large")
     output_format: str = Field(default="txt", description="Output: txt (plain text), srt (subtitles with timestamps), vtt (web subtitles), json (full data)")
-    words_per_segment: Optional[int] = Field(default=None, description="For shorter timestamp segments (~3 sec), set to 10. Only works for files <10 min. Makes transcription 10x slower.")
+    words_per_segment: Optional[int] = Field(default=None, description="For shorter timestamp segments (~3 sec), set to 10. Groups word timestamps into lines of this many words.")
+    save_to_disk: bool = Field(default=True, description="Save <name>.<format> to output_dir. Set false to only return the transcript (faster-whisper backend).")
+
+# Built once; list_tools hands out the same dict every time
+INPUT_SCHEMA = TranscribeArgs.model_json_schema()
 
 @server.list_tools()
 async def list_tools():
     return [Tool(
         name=TOOL_NAME,
         description=TOOL_DESCRIPTION,
-        inputSchema=TranscribeArgs.model_json_schema()
+        inputSchema=INPUT_SCHEMA
     )]
 
 @server.call_tool()
@@ -90,110 +144,365 @@ async def call_tool(name: str, arguments: dict):
     
     try:
         args = TranscribeArgs(**arguments)
-        result = do_transcribe(args)
-        return [TextContent(type="text", text=result)]
+        # ffmpeg and the model are blocking; keep them off the event loop
+        parts = await asyncio.to_thread(do_transcribe, args)
+        return [TextContent(type="text", text=part) for part in parts]
     except Exception as e:
         return [TextContent(type="text", text=f"Error: {e}")]
 
-def do_transcribe(args: TranscribeArgs) -> str:
-    """Transcribe audio/video with local Whisper"""
-    import time
-    from datetime import datetime
-    
-    # Log file for debugging
-    log_file = "/tmp/transcribe.log"
-    def log(msg):
-        with open(log_file, "a") as f:
-            f.write(f"{datetime.now().isoformat()} - {msg}\n")
-        print(msg, file=sys.stderr)
-    
-    log(f"=== NEW TRANSCRIPTION REQUEST ===")
-    log(f"Input: {args.file}")
+# ============== Transcript Writers ==============
+
+def _timestamp(seconds: float, sep: str) -> str:
+    """HH:MM:SS<sep>mmm as used by SRT (',') and WebVTT ('.')"""
+    ms = int(round(seconds * 1000))
+    h, ms = divmod(ms, 3_600_000)
+    m, ms = divmod(ms, 60_000)
+    s, ms = divmod(ms, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d}{sep}{ms:03d}"
+
+def _write_txt(segments, language):
+    return "".join(f"{text}\n" for _, _, text in segments)
+
+def _write_srt(segments, language):
+    return "".join(
+        f"{i}\n{_timestamp(start, ',')} --> {_timestamp(end, ',')}\n{text}\n\n"
+        for i, (start, end, text) in enumerate(segments, 1)
+    )
+
+def _write_vtt(segments, language):
+    return "WEBVTT\n\n" + "".join(
+        f"{_timestamp(start, '.')} --> {_timestamp(end, '.')}\n{text}\n\n"
+        for start, end, text in segments
+    )
+
+def _write_json(segments, language):
+    return json.dumps({
+        "text": " ".join(text for _, _, text in segments),
+        "language": language,
+        "segments": [
+            {"id": i, "start": start, "end": end, "text": text}
+            for i, (start, end, text) in enumerate(segments)
+        ],
+    }, ensure_ascii=False, indent=2)
+
+WRITERS = {"txt": _write_txt, "srt": _write_srt, "vtt": _write_vtt, "json": _write_json}
+
+# ============== Model Cache ==============
+
+# Friendly names for the distilled/turbo checkpoints, which need far fewer
+# decoder passes than the reference models at similar accuracy
+_MODEL_ALIAS = {
+    "fast": "distil-small.en",
+    "accurate": "distil-large-v3",
+    "turbo": "large-v3-turbo",
+}
+# The distil checkpoints are English-only
+_MULTILINGUAL = {"distil-small.en": "small", "distil-large-v3": "large-v3-turbo"}
+# The whisper CLI only knows the reference checkpoints
+_CLI_ALIAS = {"fast": "base", "accurate": "large-v3", "turbo": "turbo"}
+
+def _model_name(model: str, language: str) -> str:
+    if WhisperModel is None:
+        return _CLI_ALIAS.get(model, model)
+    name = _MODEL_ALIAS.get(model, model)
+    if language != "en":
+        name = _MULTILINGUAL.get(name, name)
+    return name
+
+# Loaded models are kept for the life of the skill process so only the
+# first request per model pays for reading the weights. Each model is
+# wrapped in a BatchedInferencePipeline that runs VAD-sliced chunks
+# through the encoder BATCH_SIZE at a time.
+_MODEL_CACHE = {}
+_MODEL_LOCK = threading.Lock()
+BATCH_SIZE = 8
+# The "fast" preset decodes greedily; everything else keeps faster-whisper's beam search
+DEFAULT_BEAM_SIZE = 5
+_BEAM_SIZE = {"fast": 1}
+
+def _device_options() -> dict:
+    """Pick device and precision: int8 weights with fp16 activations on CUDA, int8 on CPU.
+    CTranslate2 has no Metal backend, so Apple GPUs run the CPU path. On CPU the
+    batched chunks are spread over every core (CTranslate2 defaults to 4 threads)."""
+    if ctranslate2.get_cuda_device_count() > 0:
+        return {"device": "cuda", "compute_type": "int8_float16", "flash_attention": True}
+    return {"device": "cpu", "compute_type": "int8", "cpu_threads": os.cpu_count() or 0}
+
+def _get_pipeline(name: str):
+    pipeline = _MODEL_CACHE.get(name)
+    if pipeline is None:
+        with _MODEL_LOCK:
+            pipeline = _MODEL_CACHE.get(name)
+            if pipeline is None:
+                pipeline = BatchedInferencePipeline(model=WhisperModel(name, **_device_options()))
+                _MODEL_CACHE[name] = pipeline
+    return pipeline
+
+def _segment_lines(segments, words_per_segment):
+    """One (start, end, text) triple per faster-whisper segment"""
+    # segments is lazy - decoding happens while we iterate
+    return [(seg.start, seg.end, seg.text.strip()) for seg in segments]
+
+def _word_lines(segments, words_per_segment):
+    """Regroup word timestamps into (start, end, text) triples of words_per_segment words"""
+    result = []
+    for seg in segments:
+        words = iter(seg.words or ())
+        while group := list(islice(words, words_per_segment)):
+            text = "".join(w.word for w in group).strip()
+            result.append((group[0].start, group[-1].end, text))
+    return result
+
+def _run_faster_whisper(audio, model: str, args: TranscribeArgs):
+    """Transcribe in-process and return (start, end, text) triples, language and duration"""
+    pipeline = _get_pipeline(model)
+    segments, info = pipeline.transcribe(audio, batch_size=BATCH_SIZE, language=args.language,
+                                         beam_size=_BEAM_SIZE.get(args.model, DEFAULT_BEAM_SIZE),
+                                         vad_filter=True, word_timestamps=bool(args.words_per_segment))
+    collect = _word_lines if args.words_per_segment else _segment_lines
+    return collect(segments, args.words_per_segment), info.language, info.duration
+
+TRANSCRIPT_CHUNK_CHARS = 16000
+
+def _split_text(text: str, size: int) -> List[str]:
+    """Split text into pieces of roughly `size` chars, breaking after a newline when possible"""
+    parts = []
+    start = 0
+    while len(text) - start > size:
+        cut = text.rfind("\n", start, start + size) + 1 or start + size
+        parts.append(text[start:cut])
+        start = cut
+    parts.append(text[start:])
+    return parts
+
+def _probe(path: str, st: Optional[os.stat_result] = None) -> dict:
+    """Duration plus the first audio stream's layout, in ffprobe's JSON shape ({} if unavailable).
+
+    Cached per file version. PCM WAV headers are read directly, which is much
+    cheaper than starting ffprobe; anything else (or a header we can't make
+    sense of) still goes through ffprobe.
+    """
+    if st is None:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return {}
+    return _probe_cached(path, st.st_mtime_ns, st.st_size)
+
+@functools.lru_cache(maxsize=256)
+def _probe_cached(path: str, mtime_ns: int, size: int) -> dict:
+    parser = _HEADER_PARSERS.get(Path(path).suffix.lower())
+    if parser is not None:
+        try:
+            with open(path, "rb") as f:
+                info = parser(f, size)
+            if info:
+                return info
+        except (OSError, ValueError, IndexError, struct.error, ZeroDivisionError):
+            pass
+    return _ffprobe(path)
+
+def _ffprobe(path: str) -> dict:
+    """One ffprobe call for duration plus the first audio stream's layout ({} if unavailable)"""
+    if not _HAS_FFPROBE:
+        return {}
+    try:
+        probe_cmd = [FFPROBE, "-v", "error", "-select_streams", "a:0",
+                     "-show_entries", "format=duration,bit_rate:stream=codec_name,channels,bit_rate,sample_rate",
+                     "-of", "json", path]
+        probe_result = subprocess.run(probe_cmd, capture_output=True, timeout=30)
+        if probe_result.returncode == 0:
+            return json.loads(probe_result.stdout)
+    except Exception:
+        pass
+    return {}
+
+# ============== Header Probes ==============
+
+def _probe_result(duration: float, size: int, codec: str, channels: int, sample_rate: int, bit_rate=None) -> dict:
+    stream = {"codec_name": codec, "channels": channels, "sample_rate": str(sample_rate)}
+    if bit_rate:
+        stream["bit_rate"] = str(int(bit_rate))
+    return {"format": {"duration": str(duration), "bit_rate": str(int(size * 8 / duration))},
+            "streams": [stream]}
+
+def _parse_wav(f, size: int):
+    """RIFF/WAVE: fmt chunk for the layout, data chunk size for the duration"""
+    riff = f.read(12)
+    if riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+        return None
+    fmt = None
+    while len(header := f.read(8)) == 8:
+        chunk_id, chunk_size = struct.unpack("<4sI", header)
+        if chunk_id == b"fmt ":
+            fmt = f.read(chunk_size)
+            f.seek(chunk_size & 1, 1)
+        elif chunk_id == b"data":
+            if fmt is None:
+                return None
+            tag, channels, sample_rate, byte_rate, _, bits = struct.unpack("<HHIIHH", fmt[:16])
+            codec = {1: f"pcm_s{bits}le", 3: f"pcm_f{bits}le"}.get(tag)
+            if codec is None:
+                return None
+            # Streaming writers may leave the size as 0 or 0xFFFFFFFF; trust the file
+            data_size = min(chunk_size, size - f.tell()) or size - f.tell()
+            return _probe_result(data_size / byte_rate, size, codec, channels, sample_rate, byte_rate * 8)
+        else:
+            f.seek(chunk_size + (chunk_size & 1), 1)
+    return None
+
+_HEADER_PARSERS = {
+    ".wav": _parse_wav,
+}
+
+def do_transcribe(args: TranscribeArgs) -> List[str]:
+    """Transcribe audio/video with local Whisper. Returns the report as a list of text chunks."""
+    logger.info(f"=== NEW TRANSCRIPTION REQUEST ===")
+    logger.info(f"Input: {args.file}")
     
-    if not os.path.exists(WHISPER):
-        return f"ERROR: whisper not found at {WHISPER}. Install with: pip install openai-whisper"
+    if WhisperModel is None and not _HAS_WHISPER:
+        return [f"ERROR: whisper not found at {WHISPER}. Install with: pip install faster-whisper"]
+
+    if WhisperModel is not None and args.output_format not in WRITERS:
+        return [f"ERROR: Unsupported output format: {args.output_format} (use {', '.join(WRITERS)})"]
     
-    if not os.path.exists(args.file):
-        return f"ERROR: File not found: {args.file}"
+    # One stat checks the input exists and gives the size and the probe cache key
+    try:
+        st = os.stat(args.file)
+    except OSError:
+        return [f"ERROR: File not found: {args.file}"]
+    file_size = st.st_size / (1024 * 1024)
     
+    model = _model_name(args.model, args.language)
     output_dir = args.output_dir or str(Path(args.file).parent)
-    os.makedirs(output_dir, exist_ok=True)
+    # Only the CLI (temp file + its own output) and save_to_disk write there
+    if WhisperModel is None or args.save_to_disk:
+        os.makedirs(output_dir, exist_ok=True)
     
     # Check if file needs compression (>10MB OR >5 minutes)
-    # For speech transcription, 32kbps mono is sufficient and MUCH faster
-    file_size = os.path.getsize(args.file) / (1024 * 1024)
+    # Whisper works on 16kHz mono anyway, so large inputs are decoded to exactly that up front
     audio_to_transcribe = args.file
+    feeder = None  # ffmpeg piping decoded audio into the whisper CLI
+    cli_output_dir = output_dir
     
-    # Get duration to decide on compression
-    media_duration_for_compress = 0
-    ffprobe = shutil.which("ffprobe") or "/opt/homebrew/bin/ffprobe"
-    if os.path.exists(ffprobe):
-        try:
-            probe_cmd = [ffprobe, "-v", "error", "-show_entries", "format=duration", 
-                        "-of", "default=noprint_wrappers=1:nokey=1", args.file]
-            probe_result = subprocess.run(probe_cmd, capture_output=True, text=True, timeout=30)
-            if probe_result.returncode == 0:
-                media_duration_for_compress = float(probe_result.stdout.strip())
-        except Exception:
-            pass
+    # Get duration and audio stream layout in one probe to decide on compression
+    probe = _probe(args.file, st)
+    fmt = probe.get("format", {})
+    media_duration = float(fmt.get("duration", 0))
+    stream = dict((probe.get("streams") or [{}])[0])  # probe results are cached; don't mutate
+    stream.setdefault("bit_rate", fmt.get("bit_rate"))
     
-    # Compress if file > 10MB OR duration > 5 minutes (300 seconds)
-    needs_compression = file_size > 10 or media_duration_for_compress > 300
+    # Compress if file > 10MB OR duration > 5 minutes (300 seconds),
+    # unless the audio is already low-bitrate mono in a compact codec
+    already_small = (
+        stream.get("channels") == 1
+        and int(stream.get("bit_rate") or 10**9) <= 48000
+        and stream.get("codec_name") in ("mp3", "opus", "aac")
+    )
+    needs_compression = (file_size > 10 or media_duration > 300) and not already_small
     
-    log(f"File size: {file_size:.1f}MB, Duration: {media_duration_for_compress:.0f}s, Needs compression: {needs_compression}")
+    logger.info(f"File size: {file_size:.1f}MB, Duration: {media_duration:.0f}s, "
+        f"Audio: {stream.get('codec_name')}/{stream.get('channels')}ch/{stream.get('bit_rate')}bps, "
+        f"Needs compression: {needs_compression}")
     
     if needs_compression:
-        if not os.path.exists(FFMPEG):
-             return f"ERROR: File needs compression but ffmpeg not found at {FFMPEG}"
+        if not _HAS_FFMPEG:
+             return [f"ERROR: File needs compression but ffmpeg not found at {FFMPEG}"]
              
-        compressed = f"{output_dir}/compressed_temp.mp3"
-        compress_cmd = [FFMPEG, "-i", args.file, "-b:a", "32k", "-ac", "1", "-y", compressed]
-        log(f"Starting compression...")
         compress_start = time.time()
-        subprocess.run(compress_cmd, capture_output=True, timeout=300)
-        compress_time = time.time() - compress_start
-        compressed_size = os.path.getsize(compressed) / (1024 * 1024)
-        log(f"Compression done in {compress_time:.1f}s. New size: {compressed_size:.1f}MB")
-        audio_to_transcribe = compressed
+        if WhisperModel is not None:
+            # Decode straight to 16kHz mono PCM and hand the samples to the
+            # model in memory - no temp file to write and read back
+            logger.info(f"Starting decode to PCM...")
+            decode_cmd = [FFMPEG, "-threads", "0", "-loglevel", "error", "-i", args.file,
+                          "-map", "0:a:0", "-vn", "-f", "s16le", "-ac", "1", "-ar", "16000", "-"]
+            decoded = subprocess.run(decode_cmd, capture_output=True, timeout=300)
+            if decoded.returncode != 0:
+                return [f"ERROR: ffmpeg failed to decode {args.file}: {decoded.stderr.decode(errors='replace')[-500:]}"]
+            audio_to_transcribe = np.frombuffer(decoded.stdout, dtype=np.int16).astype(np.float32) / 32768.0
+            logger.info(f"Decode done in {time.time() - compress_start:.1f}s. {len(decoded.stdout) / (1024 * 1024):.1f}MB PCM")
+        else:
+            # Decode to 16kHz mono WAV (what Whisper resamples to anyway) and
+            # pipe it into the CLI's stdin; nothing is written to disk and the
+            # decode overlaps with whisper loading its model
+            decode_cmd = [FFMPEG, "-loglevel", "error", "-i", args.file, "-map", "0:a:0", "-vn",
+                          "-ac", "1", "-ar", "16000", "-f", "wav", "-"]
+            logger.info(f"Streaming decode into whisper...")
+            feeder = subprocess.Popen(decode_cmd, stdin=subprocess.DEVNULL,
+                                      stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            audio_to_transcribe = "-"
+            # whisper names its output after the input ("-"), so let it write
+            # into a private dir and move the result into place afterwards
+            cli_output_dir = tempfile.mkdtemp(prefix="transcribe_", dir=output_dir)
     
-    cmd = [WHISPER, audio_to_transcribe, "--output_dir", output_dir, 
-           "--output_format", args.output_format, "--model", args.model, "--language", args.language]
+    cmd = [WHISPER, str(audio_to_transcribe), "--output_dir", cli_output_dir, 
+           "--output_format", args.output_format, "--model", model, "--language", args.language]
     
-    # Add word-level timestamps if words_per_segment is specified (for shorter segments ~3-5 sec)
-    # But skip for long files (>10 min) as it makes transcription 10x slower
+    # Word-level grouping (shorter ~3-5 sec segments) is done in-process from
+    # faster-whisper's word timestamps; the CLI's Python alignment is too slow to use
     if args.words_per_segment:
-        if media_duration_for_compress > 600:  # > 10 minutes
-            log(f"Skipping word_timestamps for long file ({media_duration_for_compress/60:.0f} min) - using standard ~20-30 sec segments instead")
+        if WhisperModel is None:
+            logger.info(f"Ignoring words_per_segment: needs faster-whisper")
         else:
-            cmd.extend(["--word_timestamps", "True", "--max_words_per_line", str(args.words_per_segment)])
-            log(f"Using word timestamps with {args.words_per_segment} words per segment")
+            logger.info(f"Using word timestamps with {args.words_per_segment} words per segment")
     
-    log(f"Starting whisper with model={args.model}, format={args.output_format}")
-
-    # Get media duration using ffprobe
-    media_duration = 0
-    ffprobe = shutil.which("ffprobe") or "/opt/homebrew/bin/ffprobe"
-    if os.path.exists(ffprobe):
-        try:
-            # ffprobe -v error -show_entries format=duration -of default=noprint_wrappers=1:nokey=1 input.mp3
-            probe_cmd = [ffprobe, "-v", "error", "-show_entries", "format=duration", "-of", "default=noprint_wrappers=1:nokey=1", args.file]
-            probe_result = subprocess.run(probe_cmd, capture_output=True, text=True)
-            if probe_result.returncode == 0:
-                media_duration = float(probe_result.stdout.strip())
-        except Exception:
-            pass # Ignore if probing fails
+    backend = "faster-whisper" if WhisperModel is not None else "whisper CLI"
+    logger.info(f"Starting {backend} with model={model}, format={args.output_format}")
 
     start_time = time.time()
-    start_dt = datetime.fromtimestamp(start_time).strftime('%Y-%m-%d %H:%M:%S')
+    start_dt = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(start_time))
     
-    # 60 minute timeout for transcription
-    result = subprocess.run(cmd, capture_output=True, text=True, timeout=3600)
+    error = None
+    content = None
+    output_path = Path(output_dir) / f"{Path(args.file).stem}.{args.output_format}"
+    if WhisperModel is not None:
+        try:
+            segments, language, audio_duration = _run_faster_whisper(audio_to_transcribe, model, args)
+            content = WRITERS[args.output_format](segments, language)
+            if args.save_to_disk:
+                output_path.write_text(content, encoding="utf-8")
+            if not media_duration:
+                media_duration = audio_duration
+        except Exception as e:
+            error = str(e)
+    else:
+        # 60 minute timeout for transcription. The CLI echoes the transcript on
+        # stdout, which we read from the output file instead; stderr stays bytes
+        # and only the tail that gets reported is decoded
+        try:
+            try:
+                proc = subprocess.Popen(cmd, stdin=feeder.stdout if feeder else subprocess.DEVNULL,
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+                if feeder:
+                    feeder.stdout.close()  # whisper holds the read end; ffmpeg sees EPIPE if it dies
+                _, stderr = proc.communicate(timeout=3600)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.communicate()
+                raise
+            finally:
+                if feeder:
+                    feeder.kill()  # no-op once it has finished writing
+                    feeder.wait()
+            if proc.returncode != 0:
+                error = f"code {proc.returncode}"
+                if stderr:
+                    error += f"\nError: {stderr[-500:].decode('utf-8', errors='replace')}"
+            # The CLI wrote "-.<format>" into its private dir when fed through the pipe
+            if cli_output_dir != output_dir and not error:
+                generated = next(Path(cli_output_dir).glob(f"*.{args.output_format}"), None)
+                if generated is not None:
+                    generated.replace(output_path)
+        finally:
+            # The private dir sits inside the user's output_dir; drop it even on a timeout
+            if cli_output_dir != output_dir:
+                shutil.rmtree(cli_output_dir, ignore_errors=True)
 
     end_time = time.time()
-    end_dt = datetime.fromtimestamp(end_time).strftime('%Y-%m-%d %H:%M:%S')
+    end_dt = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(end_time))
     duration = end_time - start_time
     
-    log(f"Whisper finished in {duration:.1f}s, exit code: {result.returncode}")
+    logger.info(f"Whisper finished in {duration:.1f}s, {'failed: ' + error if error else 'ok'}")
     
     # Format duration nicely
     if duration < 60:
@@ -216,65 +525,39 @@ def do_transcribe(args: TranscribeArgs) -> str:
         speed_str = f"{speed:.1f}x"
     
     # Format file size nicely
-    file_size_mb = os.path.getsize(args.file) / (1024 * 1024)
-    size_str = f"{file_size_mb:.2f} MB"
-
-    # Cleanup temp file if created
-    if audio_to_transcribe != args.file and os.path.exists(audio_to_transcribe):
-        os.remove(audio_to_transcribe)
-
-    output = f"=== Whisper Transcription ===\n"
-    output += f"File:       {args.file}\n"
-    output += f"Size:       {size_str}\n"
-    output += f"Length:     {media_str}\n"
-    output += f"Model:      {args.model}\n"
-    output += f"Language:   {args.language}\n"
-    output += f"Output Dir: {output_dir}\n"
-    output += f"Start Time: {start_dt}\n"
-    output += f"End Time:   {end_dt}\n"
-    output += f"Elapsed:    {duration_str}\n"
-    output += f"Speed:      {speed_str}\n\n"
+    size_str = f"{file_size:.2f} MB"
+
+    header = "".join([
+        "=== Whisper Transcription ===\n",
+        f"File:       {args.file}\n",
+        f"Size:       {size_str}\n",
+        f"Length:     {media_str}\n",
+        f"Model:      {model}\n",
+        f"Language:   {args.language}\n",
+        f"Output Dir: {output_dir}\n",
+        f"Start Time: {start_dt}\n",
+        f"End Time:   {end_dt}\n",
+        f"Elapsed:    {duration_str}\n",
+        f"Speed:      {speed_str}\n\n",
+    ])
     
-    if result.returncode == 0:
-        # Attempt to read the generated file content
-        # Whisper saves as <filename>.<format>
-        # If we used a temp compressed file, the output name will match that temp file (e.g. compressed_temp.srt)
-        # We want to restore the original filename format
-        
-        generated_base = os.path.splitext(os.path.basename(audio_to_transcribe))[0]
-        generated_filename = f"{generated_base}.{args.output_format}"
-        generated_path = os.path.join(output_dir, generated_filename)
-        
-        # If we used compression, we should rename the output to match original file
-        if audio_to_transcribe != args.file:
-            original_base = os.path.splitext(os.path.basename(args.file))[0]
-            final_filename = f"{original_base}.{args.output_format}"
-            final_path = os.path.join(output_dir, final_filename)
-            if os.path.exists(generated_path):
-                os.rename(generated_path, final_path)
-            output_filename = final_filename
-            output_path = final_path
-        else:
-             output_filename = generated_filename
-             output_path = generated_path
-        
-        if os.path.exists(output_path):
+    if not error:
+        # The in-process backend already holds the transcript; only the CLI needs a read back
+        if content is None and output_path.exists():
             try:
-                content = Path(output_path).read_text()
-                # Truncate if too long (e.g. 100KB) to avoid context limit issues
-                if len(content) > 50000:
-                    content = content[:50000] + "\n... (truncated)"
-                
-                output += f"--- Transcript ({output_filename}) ---\n{content}\n-----------------------------------\n"
-                output += "✅ Success!"
+                content = output_path.read_text(encoding="utf-8")  # the CLI writes UTF-8 regardless of locale
             except Exception as e:
-                output += f"✅ Success (but failed to read output file: {e})"
-        else:
-            output += f"✅ Success (saved to {output_dir})"
-    else:
-        output += f"❌ Failed (code {result.returncode})\n"
-        if result.stderr: output += f"Error: {result.stderr[-500:]}"
-    return output
+                return [header + f"✅ Success (but failed to read output file: {e})"]
+        
+        if content is not None:
+            # Ship the full transcript as several text items rather than one huge blob
+            return [
+                header + f"--- Transcript ({output_path.name}) ---\n",
+                *_split_text(content, TRANSCRIPT_CHUNK_CHARS),
+                "\n-----------------------------------\n✅ Success!",
+            ]
+        return [header + f"✅ Success (saved to {output_dir})"]
+    return [header + f"❌ Failed ({error})\n"]
 
 async def main():
     from mcp.server.stdio import stdio_server
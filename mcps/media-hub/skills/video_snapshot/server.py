@@ -1,8 +1,10 @@
 #!/usr/bin/env python3
 import asyncio
-import subprocess
+import functools
 import os
 import shutil
+import subprocess
+import sys
 from pathlib import Path
 from typing import Optional
 from mcp.server import Server
@@ -10,7 +12,33 @@ from mcp.types import Tool, TextContent
 from pydantic import BaseModel, Field
 
 # Configuration
-FFMPEG = shutil.which("ffmpeg") or "/opt/homebrew/bin/ffmpeg"
+@functools.cache
+def ffmpeg_path() -> str:
+    """Resolved on first use: PATH first, then the Homebrew default"""
+    return shutil.which("ffmpeg") or "/opt/homebrew/bin/ffmpeg"
+
+@functools.cache
+def has_ffmpeg() -> bool:
+    """Checked once per process rather than stat'ed on every request"""
+    return os.path.exists(ffmpeg_path())
+
+@functools.cache
+def snapshot_hwaccel() -> Optional[str]:
+    """Hardware decoder for the seeks: VideoToolbox on macOS if this ffmpeg lists it, else None (software).
+
+    Probed once per process. Other platforms stay on software decode: a
+    listed CUDA/VAAPI hwaccel says nothing about whether a device exists.
+    """
+    if sys.platform != "darwin" or not has_ffmpeg():
+        return None
+    try:
+        result = subprocess.run([ffmpeg_path(), "-hide_banner", "-hwaccels"], capture_output=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return "videotoolbox" if b"videotoolbox" in result.stdout.split() else None
+
+# Frame grabs are split across at most this many concurrent ffmpeg processes
+SNAPSHOT_CONCURRENCY = os.cpu_count() or 1
 
 server = Server("video_snapshot")
 
@@ -19,13 +47,17 @@ class VideoSnapshotArgs(BaseModel):
     video_file: str = Field(description="Absolute path to the video file (MP4, MKV, etc.)")
     timestamps: list[str] = Field(description="List of timestamps to capture (e.g., ['00:01:23', '83.5'])")
     output_dir: Optional[str] = Field(default=None, description="Directory to save the snapshots. Defaults to video directory.")
+    accurate: bool = Field(default=True, description="Exact frame at each timestamp. Set false to take the nearest preceding keyframe instead (faster on long-GOP videos, may be off by a few seconds).")
+
+# Built once; list_tools hands out the same dict every time
+INPUT_SCHEMA = VideoSnapshotArgs.model_json_schema()
 
 @server.list_tools()
 async def list_tools():
     return [Tool(
         name="video_snapshot",
         description="Take high-quality image snapshots from a video at multiple timestamps.",
-        inputSchema=VideoSnapshotArgs.model_json_schema()
+        inputSchema=INPUT_SCHEMA
     )]
 
 @server.call_tool()
@@ -35,38 +67,28 @@ async def call_tool(name: str, arguments: dict):
     
     try:
         args = VideoSnapshotArgs(**arguments)
-        result = do_snapshot(args)
+        result = await do_snapshot(args)
         return [TextContent(type="text", text=result)]
     except Exception as e:
         return [TextContent(type="text", text=f"Error: {e}")]
 
 
 def parse_time_to_seconds(time_str: str) -> float:
-    """Convert a time string (HH:MM:SS.mmm or seconds) to float seconds."""
-    try:
-        # If it's just a number, return it
-        return float(time_str)
-    except ValueError:
-        pass
-        
-    # Handle HH:MM:SS.mmm
-    parts = time_str.split(':')
-    seconds = 0.0
+    """Convert a time string (HH:MM:SS.mmm, MM:SS or seconds) to float seconds, 0.0 if unparseable."""
     try:
+        # Plain seconds is the common case: one float(), no split and no exception
+        if ":" not in time_str:
+            return float(time_str)
+        parts = time_str.split(':')
         if len(parts) == 3: # HH:MM:SS
-            seconds += float(parts[0]) * 3600
-            seconds += float(parts[1]) * 60
-            seconds += float(parts[2])
-        elif len(parts) == 2: # MM:SS
-            seconds += float(parts[0]) * 60
-            seconds += float(parts[1])
-        else:
-            # parsing failed, fallback to 0 or raise
-            return 0.0
+            h, m, s = parts
+            return float(h) * 3600 + float(m) * 60 + float(s)
+        if len(parts) == 2: # MM:SS
+            m, s = parts
+            return float(m) * 60 + float(s)
+        return 0.0
     except ValueError:
         return 0.0
-        
-    return seconds
 
 def format_seconds_to_str(seconds: float) -> str:
     """Format seconds to HH-MM-SS-mmm string."""
@@ -84,10 +106,10 @@ def format_seconds_to_str(seconds: float) -> str:
     
     return f"{h:02d}-{m:02d}-{s:02d}-{ms:03d}"
 
-def do_snapshot(args: VideoSnapshotArgs) -> str:
-    """Extract frames using ffmpeg"""
-    if not os.path.exists(FFMPEG):
-        return f"ERROR: ffmpeg not found at {FFMPEG}. Please install it (e.g., brew install ffmpeg)"
+async def do_snapshot(args: VideoSnapshotArgs) -> str:
+    """Extract frames using ffmpeg, batching timestamps into a few concurrent processes"""
+    if not has_ffmpeg():
+        return f"ERROR: ffmpeg not found at {ffmpeg_path()}. Please install it (e.g., brew install ffmpeg)"
     
     if not os.path.exists(args.video_file):
         return f"ERROR: Video file not found: {args.video_file}"
@@ -95,43 +117,86 @@ def do_snapshot(args: VideoSnapshotArgs) -> str:
     # Determine output path
     video_path = Path(args.video_file)
     output_dir = Path(args.output_dir) if args.output_dir else video_path.parent
+    os.makedirs(output_dir, exist_ok=True)
     
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir, exist_ok=True)
-    
-    output_log = f"=== Video Snapshots ===\nVideo: {args.video_file}\nOutput Dir: {output_dir}\n\n"
+    output_log = [f"=== Video Snapshots ===\nVideo: {args.video_file}\nOutput Dir: {output_dir}\n\n"]
     success_count = 0
     
+    grabs = {}  # output path -> timestamp; timestamps that name the same frame share one grab
+    outputs = []
     for ts in args.timestamps:
         # normalize string to standardized filename format
         secs = parse_time_to_seconds(ts)
         time_suffix = format_seconds_to_str(secs)
         
         filename = f"{video_path.stem}_{time_suffix}.jpg"
-        output_path = output_dir / filename
-        
-        # ffmpeg command
-        cmd = [
-            FFMPEG,
-            "-ss", ts, # keep original string for ffmpeg as it handles it well
-            "-i", args.video_file,
-            "-frames:v", "1",
-            "-q:v", "2",
-            "-y", # overwrite
-            str(output_path)
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        if result.returncode == 0 and output_path.exists():
-            output_log += f"✅ {ts} -> {filename}\n"
+        outputs.append((ts, filename))
+        grabs.setdefault(output_dir / filename, ts)
+    
+    # Spread the grabs round-robin over up to one ffmpeg per core; each ffmpeg
+    # handles its share in a single run instead of one process per timestamp
+    grab_list = list(grabs.items())
+    workers = min(SNAPSHOT_CONCURRENCY, len(grab_list))
+    batches = [grab_list[i::workers] for i in range(workers)]
+    hwaccel = await asyncio.to_thread(snapshot_hwaccel)
+    batch_results = await asyncio.gather(*(run_snapshots(args.video_file, batch, args.accurate, hwaccel) for batch in batches))
+    results = {
+        output_path: result
+        for batch, batch_result in zip(batches, batch_results)
+        for (output_path, _), result in zip(batch, batch_result)
+    }
+    
+    # Report in the order the timestamps were given
+    for ts, filename in outputs:
+        returncode, created = results[output_dir / filename]
+        if returncode == 0 and created:
+            output_log.append(f"✅ {ts} -> {filename}\n")
             success_count += 1
         else:
-            output_log += f"❌ {ts} -> Failed (code {result.returncode})\n"
+            output_log.append(f"❌ {ts} -> Failed (code {returncode})\n")
 
-    output_log += f"\nSummary: {success_count}/{len(args.timestamps)} snapshots created."
+    output_log.append(f"\nSummary: {success_count}/{len(args.timestamps)} snapshots created.")
         
-    return output_log
+    return "".join(output_log)
+
+def snapshot_cmd(video_file: str, grabs: list, accurate: bool = True, hwaccel: Optional[str] = None) -> list:
+    """One ffmpeg command for several (output_path, timestamp) grabs.
+
+    Each timestamp gets its own input with a fast -ss seek, mapped to its own
+    single-frame output, so nothing between the timestamps is decoded.
+    Without accurate, -noaccurate_seek also skips decoding from the keyframe
+    up to the timestamp and the keyframe itself is used. With hwaccel the
+    frames are decoded on the GPU and copied back for the JPEG encode.
+    """
+    cmd = [ffmpeg_path(), "-y"] # overwrite
+    seek_opts = [] if accurate else ["-noaccurate_seek"]
+    if hwaccel:
+        seek_opts += ["-hwaccel", hwaccel]
+    for _, ts in grabs:
+        cmd += [*seek_opts, "-ss", ts, "-i", video_file] # keep original string for ffmpeg as it handles it well
+    for i, (output_path, _) in enumerate(grabs):
+        cmd += ["-map", f"{i}:v:0", "-frames:v", "1", "-q:v", "2", str(output_path)]
+    return cmd
+
+async def run_snapshots(video_file: str, grabs: list, accurate: bool = True, hwaccel: Optional[str] = None) -> list:
+    """Run a batch of grabs; returns (returncode, whether the image exists) per grab"""
+    proc = await asyncio.create_subprocess_exec(
+        *snapshot_cmd(video_file, grabs, accurate, hwaccel),
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    returncode = await proc.wait()
+    if returncode != 0 and hwaccel:
+        # Not every codec/profile decodes in hardware; redo the batch in software
+        return await run_snapshots(video_file, grabs, accurate)
+    if returncode != 0 and len(grabs) > 1:
+        # One bad timestamp fails the whole run; retry individually to tell which
+        results = []
+        for grab in grabs:
+            results += await run_snapshots(video_file, [grab], accurate)
+        return results
+    return [(returncode, output_path.exists()) for output_path, _ in grabs]
 
 async def main():
     from mcp.server.stdio import stdio_server
@@ -1,17 +1,31 @@
 #!/usr/bin/env python3
 import asyncio
-import subprocess
+import json
 import os
 import shutil
+import sys
+from collections import OrderedDict
 from pathlib import Path
-from typing import Literal
+from typing import Literal, Optional
 from mcp.server import Server
 from mcp.types import Tool, TextContent
 from pydantic import BaseModel, Field
 
 # Configuration
 DEFAULT_OUTPUT = Path.home() / "Downloads"
-YT_DLP = shutil.which("yt-dlp") or "/opt/homebrew/bin/yt-dlp"
+
+def _resolve(name: str, fallback: str) -> str:
+    """Locate a binary once at import: PATH first, then the Homebrew default"""
+    return shutil.which(name) or fallback
+
+YT_DLP = _resolve("yt-dlp", "/opt/homebrew/bin/yt-dlp")
+_HAS_YT_DLP = os.path.exists(YT_DLP)
+if not _HAS_YT_DLP:
+    print(f"WARNING: yt-dlp not found at {YT_DLP}", file=sys.stderr)
+
+# Recently probed video metadata (url -> formats), so retries skip the lookup
+YT_INFO_CACHE_SIZE = 32
+_YT_INFO: "OrderedDict[str, dict]" = OrderedDict()
 
 server = Server("youtube_download")
 
@@ -22,12 +36,15 @@ class YouTubeDownloadArgs(BaseModel):
     output_dir: str = Field(default=str(DEFAULT_OUTPUT), description="Output directory")
     quality: str = Field(default="best", description="Quality: best, 1080p, 720p, 480p for video; best, 320, 192, 128 for audio")
 
+# Built once; list_tools hands out the same dict every time
+INPUT_SCHEMA = YouTubeDownloadArgs.model_json_schema()
+
 @server.list_tools()
 async def list_tools():
     return [Tool(
         name="youtube_download",
         description="Download YouTube video as MP4 or extract audio as MP3.",
-        inputSchema=YouTubeDownloadArgs.model_json_schema()
+        inputSchema=INPUT_SCHEMA
     )]
 
 @server.call_tool()
@@ -37,20 +54,75 @@ async def call_tool(name: str, arguments: dict):
     
     try:
         args = YouTubeDownloadArgs(**arguments)
-        result = do_youtube_download(args)
+        result = await do_youtube_download(args)
         return [TextContent(type="text", text=result)]
     except Exception as e:
         return [TextContent(type="text", text=f"Error: {e}")]
 
-def do_youtube_download(args: YouTubeDownloadArgs) -> str:
+async def _probe_yt(url: str) -> dict:
+    """Fetch format metadata with yt-dlp -J ({} on failure), LRU-cached by url"""
+    info = _YT_INFO.get(url)
+    if info is not None:
+        _YT_INFO.move_to_end(url)
+        return info
+    proc = await asyncio.create_subprocess_exec(
+        YT_DLP, "-J", "--no-playlist", "--no-warnings", url,
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL)
+    try:
+        stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=60)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        return {}
+    if proc.returncode != 0:
+        return {}
+    try:
+        info = {"formats": json.loads(stdout).get("formats") or []}
+    except ValueError:
+        return {}
+    _YT_INFO[url] = info
+    if len(_YT_INFO) > YT_INFO_CACHE_SIZE:
+        _YT_INFO.popitem(last=False)
+    return info
+
+def _pick_format(info: dict, fmt: str, quality: str) -> Optional[str]:
+    """Choose exact format id(s) from probed metadata, or None to let yt-dlp decide"""
+    formats = info.get("formats") or []
+    audio = [f for f in formats if f.get("vcodec") == "none" and f.get("acodec") not in (None, "none")]
+    if fmt == "mp3":
+        best = max(audio, key=lambda f: f.get("abr") or 0, default=None)
+        return best["format_id"] if best else None
+    
+    # Same preference as the format_map expressions: H.264 mp4 video, then any
+    # mp4 video, each paired with the best m4a audio
+    limit = int(quality[:-1]) if quality[:-1].isdigit() and quality.endswith("p") else None
+    m4a = [f for f in audio if f.get("ext") == "m4a"]
+    videos = [
+        f for f in formats
+        if f.get("acodec") == "none" and f.get("vcodec") not in (None, "none") and f.get("ext") == "mp4"
+        and (limit is None or (f.get("height") or 0) <= limit)
+    ]
+    if not m4a or not videos:
+        return None
+    videos = [f for f in videos if f["vcodec"].startswith("avc")] or videos
+    video = max(videos, key=lambda f: (f.get("height") or 0, f.get("tbr") or 0))
+    audio_fmt = max(m4a, key=lambda f: f.get("abr") or 0)
+    return f"{video['format_id']}+{audio_fmt['format_id']}"
+
+async def do_youtube_download(args: YouTubeDownloadArgs) -> str:
     """Download YouTube video/audio"""
-    if not os.path.exists(YT_DLP):
+    if not _HAS_YT_DLP:
         return f"ERROR: yt-dlp not found at {YT_DLP}. Install with: brew install yt-dlp"
     
     os.makedirs(args.output_dir, exist_ok=True)
-    cmd = [YT_DLP, "--no-playlist"]
+    cmd = [YT_DLP, "--no-playlist", "--concurrent-fragments", "8"]
+    
+    # Resolve the exact format id up front; fall back to selector expressions
+    format_id = _pick_format(await _probe_yt(args.url), args.format, args.quality)
     
     if args.format == "mp3":
+        if format_id:
+            cmd.extend(["-f", format_id])
         cmd.extend(["-x", "--audio-format", "mp3"])
         if args.quality != "best":
             cmd.extend(["--audio-quality", args.quality])
@@ -63,24 +135,29 @@ def do_youtube_download(args: YouTubeDownloadArgs) -> str:
             "720p": "bv*[vcodec^=avc][height<=720][ext=mp4]+ba[ext=m4a]/bv*[height<=720][ext=mp4]+ba[ext=m4a]/best",
             "480p": "bv*[vcodec^=avc][height<=480][ext=mp4]+ba[ext=m4a]/bv*[height<=480][ext=mp4]+ba[ext=m4a]/best",
         }
-        cmd.extend(["-f", format_map.get(args.quality, format_map["best"])])
+        cmd.extend(["-f", format_id or format_map.get(args.quality, format_map["best"])])
         cmd.extend(["--merge-output-format", "mp4"])
     
     # Use generic template to avoid special char issues in filenames
     cmd.extend(["-o", f"{args.output_dir}/%(title)s.%(ext)s", args.url])
     
-    # Run synchronously as this is already in a subprocess from the Hub's perspective
-    # But wait, MCP server.run is async. 
-    # For a long running job like download, we should accept blocking IF the hub handles it.
-    # The Hub uses standard asyncio.subprocess, so if we block the event loop HERE, 
-    # we block this specific skill, which is fine (one req at a time per skill is default stdio behavior anyway).
-    
-    result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
+    # Run yt-dlp without blocking the event loop, so the skill keeps answering
+    # list_tools and other requests while a long download is in progress
+    proc = await asyncio.create_subprocess_exec(
+        *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=600)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        return f"ERROR: yt-dlp timed out after 600s for {args.url}"
+    stdout = stdout.decode(errors="replace")
+    stderr = stderr.decode(errors="replace")
     
     output = f"=== YouTube Download ===\nURL: {args.url}\nFormat: {args.format}\nOutput: {args.output_dir}\n\n"
-    if result.stdout: output += result.stdout + "\n"
-    if result.stderr: output += result.stderr + "\n"
-    output += "✅ Success!" if result.returncode == 0 else f"❌ Failed (code {result.returncode})"
+    if stdout: output += stdout + "\n"
+    if stderr: output += stderr + "\n"
+    output += "✅ Success!" if proc.returncode == 0 else f"❌ Failed (code {proc.returncode})"
     return output
 
 async def main():